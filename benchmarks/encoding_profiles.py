@@ -0,0 +1,71 @@
+"""Compare the storage encoding profiles of converted VENUS parquet files.
+
+Converted files are rewritten with every profile in ``ENCODING_PROFILES``
+and the size on disk, write time and read throughput are reported. Without
+input files, synthetic VENUS databases are converted first::
+
+    python -m benchmarks.encoding_profiles data/venus --columns inj_i g28_fw
+    python -m benchmarks.encoding_profiles --rows 200000 --output profiles.csv
+"""
+
+import argparse
+import datetime as dt
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import polars as pl
+
+from benchmarks.synthetic import synthetic_venus_db_files, write_synthetic_venus_db
+
+
+def _converted_files(paths: Sequence[Path]) -> List[Path]:
+    files = []
+    for path in paths:
+        files.extend(sorted(path.glob("*.parquet")) if path.is_dir() else [path])
+    return files
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    from ops.ecris.analysis.io.convert_venus_data import (
+        compare_encoding_profiles,
+        convert_venus_db_files,
+    )
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="*", type=Path,
+                        help="converted VENUS parquet files or directories")
+    parser.add_argument("--columns", nargs="*", help="columns read in the column read test")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--rows", type=int, default=50_000,
+                        help="rows per synthetic file when no paths are given")
+    parser.add_argument("--output", type=Path, help="write the comparison as CSV to this file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.paths:
+            files = _converted_files(args.paths)
+        else:
+            db_files = synthetic_venus_db_files(Path(tmp) / "db", 3, args.rows, n_columns=60)
+            # a file with fewer channels gets filler columns when converted
+            db_files.append(write_synthetic_venus_db(
+                Path(tmp) / "db" / "venus_data_short.db", dt.datetime(2025, 7, 31),
+                n_rows=args.rows, n_columns=40, interval_ms=86_400_000 // args.rows,
+            ))
+            convert_venus_db_files(db_files, Path(tmp) / "converted", overwrite=True)
+            files = _converted_files([Path(tmp) / "converted"])
+        if not files:
+            print("No converted VENUS files found")
+            return 1
+        result = compare_encoding_profiles(files, columns=args.columns, repeats=args.repeat)
+
+    with pl.Config(tbl_cols=-1, tbl_width_chars=200):
+        print(result)
+    if args.output is not None:
+        result.write_csv(args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""Offline benchmark suite for the analysis hot paths.
+
+Every benchmark generates its own synthetic input, times the function at
+several data sizes and the results are written as JSON. A stored result
+file can be passed as a baseline to flag regressions::
+
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --baseline bench.json --tolerance 0.25
+"""
+
+import argparse
+import contextlib
+import datetime as dt
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from benchmarks.stand_ins import install_operations_stand_ins
+from benchmarks.synthetic import (
+    ARGON,
+    OXYGEN,
+    synthetic_venus_db_files,
+    write_synthetic_csd,
+    write_synthetic_emittance_scan,
+)
+
+MODEL_PATH = Path(__file__).parent.parent / "models" / "oxygen_nn"
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable[[Path, int], Callable[[], Any]]
+    sizes: Sequence[int]
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, sizes: Sequence[int]):
+    """Register a setup function returning the callable to time for a size."""
+
+    def register(setup: Callable[[Path, int], Callable[[], Any]]):
+        BENCHMARKS.append(Benchmark(name, setup, sizes))
+        return setup
+
+    return register
+
+
+def _read_csd(directory: Path, n_points: int, elements=(OXYGEN, ARGON)):
+    from ops.ecris.analysis.io.read_csd_file import read_csd_from_file_pair
+
+    return read_csd_from_file_pair(
+        write_synthetic_csd(directory, n_points=n_points, elements=elements)
+    )
+
+
+@benchmark("read_csd_from_file_pair", sizes=(1200, 10_000, 100_000))
+def _setup_read_csd(directory: Path, n_points: int):
+    from ops.ecris.analysis.io.read_csd_file import read_csd_from_file_pair
+
+    csd_file = write_synthetic_csd(directory, n_points=n_points)
+    return lambda: read_csd_from_file_pair(csd_file)
+
+
+@benchmark("polynomial_fit_mq", sizes=(1200, 5000, 20_000))
+def _setup_polynomial_fit(directory: Path, n_points: int):
+    from ops.ecris.analysis.csd.polynomial_fit import polynomial_fit_mq
+
+    csd = _read_csd(directory, n_points)
+    return lambda: polynomial_fit_mq(csd, [OXYGEN, ARGON], max_function_evaluations=2000)
+
+
+@benchmark("find_element_peaks", sizes=(1200, 10_000, 100_000))
+def _setup_find_element_peaks(directory: Path, n_points: int):
+    from ops.ecris.analysis.csd.m_over_q import estimate_m_over_q
+    from ops.ecris.analysis.csd.peaks import find_element_peaks
+
+    csd = _read_csd(directory, n_points)
+    csd.m_over_q = estimate_m_over_q(csd)
+    return lambda: find_element_peaks(csd, ARGON)
+
+
+@benchmark("find_oxygen_peaks", sizes=(1200,))
+def _setup_find_oxygen_peaks(directory: Path, n_points: int):
+    # the oxygen model works on peak indices, so only its training size is used
+    from ops.ecris.analysis.csd.m_over_q import estimate_m_over_q
+    from ops.ecris.analysis.csd.ml import find_oxygen_peaks, train_oxygen_model
+
+    model = train_oxygen_model(
+        MODEL_PATH / "mlp_csd_oxygen_params.json",
+        MODEL_PATH / "x_training.npy",
+        MODEL_PATH / "y_training.npy",
+    )
+    csd = _read_csd(directory, n_points, elements=(OXYGEN,))
+    csd.m_over_q = estimate_m_over_q(csd)
+    return lambda: find_oxygen_peaks(csd, model)
+
+
+@benchmark("calculate_rms_emittance", sizes=(41, 201, 1001))
+def _setup_rms_emittance(directory: Path, n_positions: int):
+    from ops.ecris.analysis.emittance_scan.rms_emittance import calculate_rms_emittance
+    from ops.ecris.analysis.io.read_emittance_scan_file import load_emittance_scan
+
+    scan_file = write_synthetic_emittance_scan(
+        directory / "emittance_scan_1754000000.h5",
+        n_positions=n_positions,
+        n_divergences=n_positions + 20,
+    )
+    scan = load_emittance_scan(scan_file)
+    return lambda: calculate_rms_emittance(scan)
+
+
+@benchmark("convert_venus_db_files", sizes=(10_000, 50_000, 200_000))
+def _setup_convert(directory: Path, n_rows: int):
+    from ops.ecris.analysis.io.convert_venus_data import convert_venus_db_files
+
+    files = synthetic_venus_db_files(directory / "db", 2, n_rows // 2, n_columns=60)
+    output = directory / "converted"
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            convert_venus_db_files(files, output, overwrite=True)
+
+    return run
+
+
+@benchmark("get_venus_data", sizes=(3, 10, 30))
+def _setup_get_venus_data(directory: Path, n_days: int):
+    from ops.ecris.analysis.io.convert_venus_data import convert_venus_db_files
+    from ops.ecris.analysis.venus_data import get_venus_data
+
+    files = synthetic_venus_db_files(directory / "db", n_days, 8640, n_columns=60)
+    output = directory / "converted"
+    with contextlib.redirect_stdout(io.StringIO()):
+        convert_venus_db_files(files, output, overwrite=True)
+    start = dt.datetime(2025, 8, 1, 6)
+    stop = start + dt.timedelta(days=n_days - 1)
+    return lambda: get_venus_data(output, ["inj_i", "g28_fw", "inj_mbar"], start, stop)
+
+
+@benchmark("import_venus_data", sizes=(1,))
+def _setup_import(directory: Path, _: int):
+    command = [sys.executable, "-c", "import ops.ecris.analysis.venus_data"]
+    root = Path(__file__).parent.parent
+    return lambda: subprocess.run(command, cwd=root, check=True)
+
+
+def time_callable(function: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return {"min": min(timings), "median": statistics.median(timings), "repeat": repeat}
+
+
+def run_benchmarks(
+    repeat: int = 3, quick: bool = False, only: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    stand_ins = install_operations_stand_ins()
+    results: Dict[str, Any] = {}
+    for bench in BENCHMARKS:
+        if only and bench.name not in only:
+            continue
+        for size in bench.sizes[:1] if quick else bench.sizes:
+            key = f"{bench.name}[{size}]"
+            with tempfile.TemporaryDirectory() as directory:
+                try:
+                    function = bench.setup(Path(directory), size)
+                except ImportError as e:
+                    print(f"{key:45s} skipped: {e}")
+                    break
+                results[key] = time_callable(function, repeat)
+            print(f"{key:45s} {results[key]['min'] * 1e3:10.2f} ms")
+    return {
+        "metadata": {
+            "created": dt.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "repeat": repeat,
+            "operations_stand_ins": stand_ins,
+        },
+        "results": results,
+    }
+
+
+def compare_to_baseline(
+    results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float
+) -> List[str]:
+    """Return the benchmarks whose minimum time grew by more than ``tolerance``."""
+    regressions = []
+    for key, current in results["results"].items():
+        previous = baseline["results"].get(key)
+        if previous is None:
+            continue
+        ratio = current["min"] / previous["min"]
+        status = "REGRESSION" if ratio > 1 + tolerance else "ok"
+        print(f"{key:45s} {ratio:6.2f}x baseline  {status}")
+        if ratio > 1 + tolerance:
+            regressions.append(key)
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, help="write results as JSON to this file")
+    parser.add_argument("--baseline", type=Path, help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative slowdown before reporting a regression")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--quick", action="store_true", help="only run the smallest sizes")
+    parser.add_argument("--only", nargs="*", help="names of the benchmarks to run")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(repeat=args.repeat, quick=args.quick, only=args.only)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare_to_baseline(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
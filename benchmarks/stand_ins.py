@@ -0,0 +1,58 @@
+"""Stand-ins for the ``ops.ecris`` operations and device packages.
+
+The emittance scan code imports ``LinearScanParameters`` and ``Axis`` from
+packages that are not dependencies of this project. When they are not
+installed, minimal equivalents are registered so the emittance scan tests
+and benchmarks still run.
+"""
+
+import sys
+import types
+from dataclasses import dataclass
+from enum import Enum
+
+
+class Axis(Enum):
+    X = 0
+    Y = 1
+
+
+@dataclass
+class LinearScanParameters:
+    axis: Axis
+    position_min: float
+    position_max: float
+    position_step: float
+    divergence_min: float
+    divergence_max: float
+    divergence_step: float
+
+
+def _register(name: str, **attributes) -> None:
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    sys.modules.setdefault(name, module)
+
+
+def install_operations_stand_ins() -> bool:
+    """Register the stand-ins unless the real packages can be imported.
+
+    :return: whether the stand-ins are used
+    :rtype: bool
+    """
+    try:
+        import ops.ecris.devices.motor_controller_specification  # noqa: F401
+        import ops.ecris.operations.emittance_scan.parameters  # noqa: F401
+
+        return False
+    except ImportError:
+        pass
+    _register("ops.ecris.devices")
+    _register("ops.ecris.devices.motor_controller_specification", Axis=Axis)
+    _register("ops.ecris.operations")
+    _register("ops.ecris.operations.emittance_scan")
+    _register(
+        "ops.ecris.operations.emittance_scan.parameters",
+        LinearScanParameters=LinearScanParameters,
+    )
+    return True
@@ -0,0 +1,190 @@
+"""Generators of synthetic input files for the benchmark suite.
+
+The files follow the layouts read by ``ops.ecris.analysis.io``, so every
+benchmark can run offline without access to real ion source data.
+"""
+
+import datetime as dt
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ops.ecris.analysis.csd.m_over_q import ALPHA_DF
+from ops.ecris.analysis.io.convert_venus_data import TIME_NAME
+from ops.ecris.analysis.io.datasheet_values import DATA_LABELS
+from ops.ecris.analysis.model import Element
+
+OXYGEN = Element("Oxygen", "O", 15.9949, 8)
+ARGON = Element("Argon", "Ar", 39.9624, 18)
+
+EXTRACTION_VOLTAGE = 20.0
+
+
+def synthetic_spectrum(
+    n_points: int,
+    elements: Sequence[Element] = (OXYGEN, ARGON),
+    m_over_q_range: tuple = (0.73, 9.0),
+    peak_width: float = 0.01,
+    noise: float = 0.01,
+    seed: int = 0,
+) -> tuple:
+    """Beam current [A] on a M/Q grid, with a hydrogen line and element peaks.
+
+    :return: M/Q grid and beam current
+    :rtype: tuple
+    """
+    rng = np.random.default_rng(seed)
+    m_over_q = np.linspace(*m_over_q_range, n_points)
+    current = 20 * np.exp(-((m_over_q - 1.0) ** 2) / (2 * peak_width**2))
+    for element in elements:
+        for q in range(1, element.atomic_number + 1):
+            peak = element.atomic_mass / q
+            height = 30 * np.exp(-((q - element.atomic_number / 2) ** 2) / 8) + 2
+            current += height * np.exp(-((m_over_q - peak) ** 2) / (2 * peak_width**2))
+    current += noise * rng.standard_normal(n_points)
+    return m_over_q, current * 1e-6
+
+
+def write_synthetic_csd(
+    directory: Path,
+    timestamp: int = 1754000000,
+    n_points: int = 1200,
+    elements: Sequence[Element] = (OXYGEN, ARGON),
+    settings: Optional[Dict[str, float]] = None,
+    seed: int = 0,
+) -> Path:
+    """Write a ``csd_<timestamp>`` file and its ``dsht_<timestamp>`` datasheet.
+
+    The dipole field is computed from the true M/Q with a small calibration
+    error, so M/Q fits have something to correct.
+
+    :return: path of the CSD file
+    :rtype: Path
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    m_over_q, current = synthetic_spectrum(n_points, elements, seed=seed)
+    time = dt.datetime.fromtimestamp(timestamp)
+    alpha = ALPHA_DF["alpha"][ALPHA_DF["time"].searchsorted(time) - 1]
+    distorted = 1.01 * m_over_q + 0.002 * m_over_q**2
+    dipole_field = alpha * np.sqrt(distorted * EXTRACTION_VOLTAGE)
+    data = np.column_stack(
+        [np.arange(n_points) * 0.05, dipole_field * 1e-4, dipole_field, current]
+    )
+    csd_file = directory / f"csd_{timestamp}"
+    np.savetxt(csd_file, data)
+
+    rng = np.random.default_rng(seed)
+    settings = dict(settings or {})
+    settings.setdefault("extraction_v", EXTRACTION_VOLTAGE)
+    for label in DATA_LABELS:
+        settings.setdefault(label.key, float(rng.uniform(0, 100)))
+    with open(directory / f"dsht_{timestamp}", "w") as f:
+        for i, (name, value) in enumerate(settings.items()):
+            f.write(f"{i} {value} {name}\n")
+    return csd_file
+
+
+def write_synthetic_venus_db(
+    path: Path,
+    start: dt.datetime,
+    n_rows: int = 10_000,
+    n_columns: int = 40,
+    n_tables: int = 4,
+    interval_ms: int = 1000,
+    seed: int = 0,
+) -> Path:
+    """Write a VENUS SQLite database with its columns spread over several tables.
+
+    Column names start with the ``DATA_LABELS`` keys and continue with
+    generic channel names; every table shares the same time stamps.
+
+    :return: path of the database
+    :rtype: Path
+    """
+    rng = np.random.default_rng(seed)
+    keys = [label.key for label in DATA_LABELS if not label.key.startswith("gas_name_")]
+    names = (keys + [f"channel_{i}" for i in range(n_columns)])[:n_columns]
+    times = int(start.timestamp() * 1000) + interval_ms * np.arange(n_rows, dtype=np.int64)
+    values = rng.standard_normal((n_rows, len(names))).cumsum(axis=0)
+
+    path.unlink(missing_ok=True)
+    with sqlite3.connect(path) as conn:
+        for table, columns in enumerate(np.array_split(np.arange(len(names)), n_tables)):
+            column_names = [names[c] for c in columns]
+            definition = ", ".join([f"{TIME_NAME} INTEGER"] + [f"{c} REAL" for c in column_names])
+            conn.execute(f"CREATE TABLE table_{table} ({definition})")
+            placeholders = ", ".join("?" * (len(column_names) + 1))
+            conn.executemany(
+                f"INSERT INTO table_{table} VALUES ({placeholders})",
+                (
+                    (int(t), *row)
+                    for t, row in zip(times, values[:, columns].tolist())
+                ),
+            )
+    return path
+
+
+def write_synthetic_emittance_scan(
+    path: Path,
+    n_positions: int = 41,
+    n_divergences: int = 61,
+    axis: str = "X",
+    extra_metadata: Optional[Dict[str, str]] = None,
+    seed: int = 0,
+) -> Path:
+    """Write an HDF5 linear emittance scan of a correlated Gaussian beam.
+
+    :return: path of the scan file
+    :rtype: Path
+    """
+    import h5py
+
+    # binary fraction steps keep np.arange in EmittanceScan exact
+    position_step, divergence_step = 0.5, 1.0
+    position_max = position_step * (n_positions - 1) / 2
+    divergence_max = divergence_step * (n_divergences - 1) / 2
+    rng = np.random.default_rng(seed)
+    x = np.linspace(-position_max, position_max, n_positions)[:, None]
+    xp = np.linspace(-divergence_max, divergence_max, n_divergences)[None, :]
+    data = np.exp(-(x**2) / (0.1 * position_max**2) - (xp - x) ** 2 / (0.1 * divergence_max**2))
+    data += 0.005 * rng.standard_normal(data.shape)
+    with h5py.File(path, "w") as f:
+        dataset = f.create_dataset("scan_data", data=data)
+        dataset.attrs.update(
+            {
+                "axis": axis,
+                "position_min": -position_max,
+                "position_max": position_max,
+                "position_step": position_step,
+                "divergence_min": -divergence_max,
+                "divergence_max": divergence_max,
+                "divergence_step": divergence_step,
+                **(extra_metadata or {}),
+            }
+        )
+    return path
+
+
+def synthetic_venus_db_files(
+    directory: Path, n_days: int, rows_per_day: int, n_columns: int, n_tables: int = 4
+) -> List[Path]:
+    directory.mkdir(parents=True, exist_ok=True)
+    start = dt.datetime(2025, 8, 1)
+    files = []
+    for day in range(n_days):
+        day_start = start + dt.timedelta(days=day)
+        name = f"venus_data_{day_start.strftime('%Y_%m_%d_%H_%M_%S')}.db"
+        files.append(
+            write_synthetic_venus_db(
+                directory / name,
+                day_start,
+                n_rows=rows_per_day,
+                n_columns=n_columns,
+                n_tables=n_tables,
+                interval_ms=86_400_000 // rows_per_day,
+                seed=day,
+            )
+        )
+    return files
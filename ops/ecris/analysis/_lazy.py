@@ -0,0 +1,31 @@
+"""Lazy attribute loading for package ``__init__`` modules, so importing a
+package does not import heavy dependencies such as matplotlib, scipy or
+scikit-learn until one of its names is used."""
+
+from importlib import import_module
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_imports(
+    module_globals: Dict[str, Any], imports: Dict[str, str]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """Create the module ``__getattr__`` and ``__dir__`` of a package.
+
+    :param module_globals: ``globals()`` of the package ``__init__``
+    :param imports: public name mapped to the relative module defining it
+    :return: ``(__getattr__, __dir__)``
+    :rtype: Tuple[Callable[[str], Any], Callable[[], List[str]]]
+    """
+    package = module_globals["__name__"]
+
+    def __getattr__(name: str) -> Any:
+        if name in imports:
+            value = getattr(import_module(imports[name], package), name)
+            module_globals[name] = value
+            return value
+        raise AttributeError(f"module {package!r} has no attribute {name!r}")
+
+    def __dir__() -> List[str]:
+        return sorted({*module_globals, *imports})
+
+    return __getattr__, __dir__
@@ -1,2 +1,26 @@
-from .m_over_q import estimate_m_over_q, rescale_with_oxygen, rescale_m_over_q
-from .peaks import ElementPeaks, find_element_peaks, Peak
+from typing import TYPE_CHECKING
+
+from ops.ecris.analysis._lazy import lazy_imports
+
+_LAZY_IMPORTS = {
+    "estimate_m_over_q": ".m_over_q",
+    "rescale_with_oxygen": ".m_over_q",
+    "rescale_m_over_q": ".m_over_q",
+    "ElementPeaks": ".peaks",
+    "find_element_peaks": ".peaks",
+    "Peak": ".peaks",
+    "SpectrumIndex": ".similarity",
+    "resample_csds": ".similarity",
+    "ResultCache": ".cache",
+    "memoize": ".cache",
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+if TYPE_CHECKING:
+    from .cache import ResultCache, memoize
+    from .m_over_q import estimate_m_over_q, rescale_m_over_q, rescale_with_oxygen
+    from .peaks import ElementPeaks, Peak, find_element_peaks
+    from .similarity import SpectrumIndex, resample_csds
+
+__getattr__, __dir__ = lazy_imports(globals(), _LAZY_IMPORTS)
@@ -0,0 +1,391 @@
+"""This module contains a content-addressed cache for CSD analysis results.
+
+Results are keyed on a hash of the function, its code, the package version
+and the content of every argument, so a cached result is reused only when
+the CSD data, the parameters and the model are all unchanged. Results are
+kept in an in-memory LRU and, optionally, in a directory that can be shared
+between worker processes.
+"""
+
+import copy
+import dataclasses
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import tempfile
+import threading
+import types
+from collections import OrderedDict
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+from ops.ecris.analysis import __version__
+from ops.ecris.analysis.csd.m_over_q import (
+    ALPHA_DF,
+    estimate_m_over_q,
+    rescale_m_over_q,
+    rescale_with_element,
+)
+from ops.ecris.analysis.csd.peaks import find_element_peaks
+from ops.ecris.analysis.instrumentation import count
+from ops.ecris.analysis.model import CSD, Element
+
+_log = getLogger(__name__)
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+def _update_hash(h: "hashlib._Hash", obj: Any) -> None:
+    h.update(type(obj).__qualname__.encode())
+    if obj is None or isinstance(obj, (bool, int, float, complex, str, bytes)):
+        h.update(repr(obj).encode())
+    elif isinstance(obj, np.ndarray) and obj.dtype == object:
+        _update_hash(h, obj.tolist())
+    elif isinstance(obj, np.ndarray):
+        h.update(f"{obj.dtype.str}{obj.shape}".encode())
+        h.update(np.ascontiguousarray(obj).data)
+    elif isinstance(obj, CSD):
+        for value in (obj.data, obj.timestamp, obj.settings, obj.m_over_q):
+            _update_hash(h, value)
+    elif isinstance(obj, (list, tuple)):
+        h.update(str(len(obj)).encode())
+        for value in obj:
+            _update_hash(h, value)
+    elif isinstance(obj, dict):
+        h.update(str(len(obj)).encode())
+        for key, value in sorted(obj.items(), key=lambda item: repr(item[0])):
+            _update_hash(h, key)
+            _update_hash(h, value)
+    elif dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        for field in dataclasses.fields(obj):
+            _update_hash(h, getattr(obj, field.name))
+    else:
+        # models and other objects are identified by their pickled state
+        h.update(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def content_hash(*args: Any, **kwargs: Any) -> str:
+    """Hash the content of arguments, e.g. CSDs, arrays, elements and models.
+
+    :return: hexadecimal SHA-256 digest
+    :rtype: str
+    """
+    h = hashlib.sha256()
+    _update_hash(h, args)
+    _update_hash(h, kwargs)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """In-memory LRU of results, backed by an optional on-disk store.
+
+    Disk entries are written atomically, so several processes can share a
+    directory. A pickled cache, e.g. passed to a process pool, keeps its
+    directory but starts with an empty in-memory LRU. When the directory grows
+    beyond ``max_disk_bytes``, the least recently used entries are removed.
+
+    :param directory: directory of the on-disk store, memory only when not given
+    :param max_memory_items: number of results kept in memory
+    :param max_disk_bytes: size limit of the on-disk store
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        max_memory_items: int = 128,
+        max_disk_bytes: int = 2**30,
+    ) -> None:
+        self.directory = Path(directory) if directory is not None else None
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # worker processes share the directory, not the in-memory results
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_memory"] = OrderedDict()
+        state["_disk_bytes"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / key[:2] / f"{key}.pkl"
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Look up a result.
+
+        :return: whether the key was found, and the result
+        :rtype: Tuple[bool, Any]
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                count("cache.memory_hits")
+                return True, copy.deepcopy(self._memory[key])
+        if self.directory is not None:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    value = pickle.load(f)
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+            except (OSError, pickle.UnpicklingError, EOFError) as e:
+                _log.warning(f"Discarding unreadable cache entry {path}: {e}")
+                path.unlink(missing_ok=True)
+            else:
+                count("cache.disk_hits")
+                self._remember(key, value)
+                return True, copy.deepcopy(value)
+        count("cache.misses")
+        return False, None
+
+    def put(self, key: str, value: Any) -> None:
+        self._remember(key, copy.deepcopy(value))
+        if self.directory is None:
+            return
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f.name, path)
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += path.stat().st_size
+        self._evict()
+
+    def _remember(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_items:
+                self._memory.popitem(last=False)
+
+    def _evict(self) -> None:
+        assert self.directory is not None
+        with self._lock:
+            if self._disk_bytes is not None and self._disk_bytes <= self.max_disk_bytes:
+                return
+            # other processes may share the directory, so its size is rescanned
+            entries = []
+            for path in self.directory.glob("*/*.pkl"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            if total > self.max_disk_bytes:
+                for _, size, path in sorted(entries):
+                    path.unlink(missing_ok=True)
+                    total -= size
+                    if total <= 0.9 * self.max_disk_bytes:
+                        break
+            self._disk_bytes = total
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self.directory is not None:
+                for path in self.directory.glob("*/*.pkl"):
+                    path.unlink(missing_ok=True)
+            self._disk_bytes = 0
+
+
+def code_fingerprint(function: Callable) -> str:
+    """Hash what determines the behavior of a function's own code.
+
+    Decorators are unwrapped, and the bytecode, constants, referenced names,
+    default arguments and closed over functions are hashed, so editing a
+    numeric constant or a default changes the fingerprint.
+
+    :param function: function to fingerprint
+    :return: hexadecimal SHA-256 digest
+    :rtype: str
+    """
+    h = hashlib.sha256()
+    _update_function_hash(h, function, set())
+    return h.hexdigest()
+
+
+def _update_function_hash(h: "hashlib._Hash", function: Callable, seen: set) -> None:
+    function = inspect.unwrap(function)
+    h.update(f"{function.__module__}.{function.__qualname__}".encode())
+    code = getattr(function, "__code__", None)
+    if code is None:
+        # builtins and other objects without bytecode
+        h.update(repr(function).encode())
+        return
+    if id(function) in seen:
+        # recursive closures
+        return
+    seen.add(id(function))
+    _update_code_hash(h, code)
+    _update_hash(h, function.__defaults__)
+    _update_hash(h, function.__kwdefaults__)
+    for cell in function.__closure__ or ():
+        try:
+            value = cell.cell_contents
+        except ValueError:
+            continue
+        # closed over data may change between calls, only functions are hashed
+        if callable(value) and hasattr(inspect.unwrap(value), "__code__"):
+            _update_function_hash(h, value, seen)
+
+
+def _update_code_hash(h: "hashlib._Hash", code: types.CodeType) -> None:
+    h.update(code.co_code)
+    h.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            # nested functions, lambdas and comprehensions
+            _update_code_hash(h, const)
+        else:
+            h.update(repr(const).encode())
+
+
+def _alpha_table() -> List[List[str]]:
+    # the M/Q calibration table is data, not code, so its content is part of the key
+    return ALPHA_DF.astype(str).to_numpy().tolist()
+
+
+def _function_key(function: Callable, version: str, depends_on: Sequence[Callable]) -> tuple:
+    return (
+        code_fingerprint(function),
+        [code_fingerprint(f) for f in depends_on],
+        __version__,
+        version,
+    )
+
+
+def _cached_call(
+    cache: ResultCache,
+    function_key: tuple,
+    compute: Callable[..., Any],
+    args: tuple,
+    kwargs: Dict[str, Any],
+) -> Any:
+    key = content_hash(function_key, args, kwargs)
+    found, value = cache.get(key)
+    if found:
+        return value
+    value = compute(*args, **kwargs)
+    cache.put(key, value)
+    return value
+
+
+def memoize(
+    cache: ResultCache, version: str = "", depends_on: Sequence[Callable] = ()
+) -> Callable[[_F], _F]:
+    """Cache the results of a pure function of its arguments' content.
+
+    The key contains the :func:`code_fingerprint` of the function and of the
+    functions in ``depends_on``, so results are recomputed after their code
+    changes. Changes to other functions called by the function are only
+    noticed when they are listed in ``depends_on`` or reflected in ``version``.
+
+    :param cache: cache storing the results
+    :param version: extra version string, e.g. of a model file, added to the key
+    :param depends_on: functions called by the function whose code is added to the key
+    :return: decorator
+    """
+
+    def decorate(function: _F) -> _F:
+        function_key = _function_key(function, version, depends_on)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            return _cached_call(cache, function_key, function, args, kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def cached_estimate_m_over_q(csd: CSD, cache: ResultCache, version: str = "") -> np.ndarray:
+    """Cached version of ``estimate_m_over_q``.
+
+    :param csd: CSD to calculate M/Q for
+    :param cache: cache storing the results
+    :param version: extra version string added to the key
+    :return: estimated M/Q
+    :rtype: np.ndarray
+    """
+    function_key = _function_key(estimate_m_over_q, version, ()) + (_alpha_table(),)
+    return _cached_call(cache, function_key, estimate_m_over_q, (csd,), {})
+
+
+def cached_polynomial_fit_mq(
+    csd: CSD, elements: List[Element], cache: ResultCache, version: str = "", **kwargs
+) -> Tuple[np.ndarray, Any]:
+    """Cached version of ``polynomial_fit_mq``.
+
+    :param csd: CSD to fit
+    :param elements: elements whose peaks are fitted
+    :param cache: cache storing the results
+    :param version: extra version string added to the key
+    :param kwargs: further arguments of ``polynomial_fit_mq``
+    :return: fitted M/Q and the optimization result
+    :rtype: Tuple[np.ndarray, Any]
+    """
+    from ops.ecris.analysis.csd.polynomial_fit import polynomial_fit_mq
+
+    function_key = _function_key(polynomial_fit_mq, version, (estimate_m_over_q,))
+    function_key += (_alpha_table(),)
+    return _cached_call(cache, function_key, polynomial_fit_mq, (csd, elements), kwargs)
+
+
+def cached_find_oxygen_peaks(
+    csd: CSD, model: Any, cache: ResultCache, version: str = "", **kwargs
+) -> Tuple[Any, float]:
+    """Cached version of ``find_oxygen_peaks``, keyed on the fitted model's state.
+
+    :param csd: CSD with M/Q set
+    :param model: trained oxygen model
+    :param cache: cache storing the results
+    :param version: extra version string, e.g. of the model files, added to the key
+    :param kwargs: further arguments of ``find_oxygen_peaks``
+    :return: oxygen peaks and their probability
+    :rtype: Tuple[ElementPeaks, float]
+    """
+    from ops.ecris.analysis.csd.ml.helpers import sorted_permutations
+    from ops.ecris.analysis.csd.ml.oxygen_model import find_oxygen_peaks
+
+    function_key = _function_key(find_oxygen_peaks, version, (sorted_permutations,))
+    return _cached_call(cache, function_key, find_oxygen_peaks, (csd, model), kwargs)
+
+
+def _rescaled_m_over_q(csd: CSD, element: Element) -> np.ndarray:
+    rescaled = copy.copy(csd)
+    rescale_with_element(rescaled, element)
+    return rescaled.m_over_q
+
+
+def cached_rescale_with_element(
+    csd: CSD, element: Element, cache: ResultCache, version: str = ""
+) -> None:
+    """Cached version of ``rescale_with_element``, which updates the CSD in place.
+
+    :param csd: CSD to rescale
+    :param element: element whose peaks are used for the rescaling
+    :param cache: cache storing the rescaled M/Q
+    :param version: extra version string added to the key
+    """
+    function_key = _function_key(
+        rescale_with_element,
+        version,
+        (estimate_m_over_q, find_element_peaks, rescale_m_over_q),
+    ) + (_alpha_table(),)
+    csd.m_over_q = _cached_call(cache, function_key, _rescaled_m_over_q, (csd, element), {})
@@ -1,2 +1,17 @@
-from .helpers import sorted_permutations
-from .oxygen_model import train_oxygen_model, find_oxygen_peaks
+from typing import TYPE_CHECKING
+
+from ops.ecris.analysis._lazy import lazy_imports
+
+_LAZY_IMPORTS = {
+    "sorted_permutations": ".helpers",
+    "train_oxygen_model": ".oxygen_model",
+    "find_oxygen_peaks": ".oxygen_model",
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+if TYPE_CHECKING:
+    from .helpers import sorted_permutations
+    from .oxygen_model import find_oxygen_peaks, train_oxygen_model
+
+__getattr__, __dir__ = lazy_imports(globals(), _LAZY_IMPORTS)
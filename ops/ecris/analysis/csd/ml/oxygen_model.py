@@ -9,6 +9,7 @@ from sklearn.neural_network import MLPClassifier
 from sklearn.preprocessing import StandardScaler
 from scipy.signal import find_peaks
 
+from ops.ecris.analysis.instrumentation import instrumented, span
 from ops.ecris.analysis.model import CSD
 from ops.ecris.analysis.csd import ElementPeaks, Peak
 from .helpers import sorted_permutations
@@ -32,6 +33,7 @@ def train_oxygen_model(model_parameters_path: Path,
     pipeline.fit(X, y)
     return pipeline
 
+@instrumented("peaks.find_oxygen_peaks")
 def find_oxygen_peaks(csd: CSD, model: Pipeline, 
                       n_peaks: List[int] | int = 10,
                       *, 
@@ -52,7 +54,9 @@ def find_oxygen_peaks(csd: CSD, model: Pipeline,
     for n in n_peaks:
         highest_peaks = sorted(all_peaks[sorted_peaks][:n])
         sorted_peaks = sorted_permutations([int(v) for v in highest_peaks])
-        probabilities = model.predict_proba(sorted_peaks)[:, 1] 
+        with span("peaks.score_oxygen_candidates", n_peaks=n) as s:
+            probabilities = model.predict_proba(sorted_peaks)[:, 1]
+            s.count("candidates", len(sorted_peaks))
         highest_prob = np.flip(np.argsort(probabilities))[0]
 
         probability = float(probabilities[highest_prob])
@@ -3,6 +3,7 @@ from typing import List, Tuple
 
 import numpy as np
 
+from ops.ecris.analysis.instrumentation import instrumented
 from ops.ecris.analysis.model import CSD, Element
 
 @dataclass
@@ -28,6 +29,7 @@ class ElementPeaks:
     def indexes(self) -> List[int]:
         return [p.index for p in self.peaks if p.use_peak]
 
+@instrumented("peaks.find_element_peaks")
 def find_element_peaks(csd: CSD, element: Element, peak_width: float = 0.1) -> ElementPeaks:
     if csd.m_over_q is None:
         raise RuntimeError('CSD m_over_q not set, cannot seek peaks')
@@ -7,6 +7,7 @@ from numpy.polynomial import Legendre
 import scipy.optimize as opt
 from scipy.signal import find_peaks
 
+from ops.ecris.analysis.instrumentation import span
 from ops.ecris.analysis.model import CSD, Element
 from ops.ecris.analysis.csd.m_over_q import estimate_m_over_q
 
@@ -63,16 +64,23 @@ def polynomial_fit_mq(
     sb = nonlinear_bounds
     lb = linear_bounds
     bounds = [lb] + [sb] * (polynomial_order - 2)
-    sol = opt.direct(
-        residual,
-        bounds,
-        maxfun=max_function_evaluations,
-        maxiter=max_iterations,
-        locally_biased=False,
-        vol_tol=1e-16 / (10 * (polynomial_order - 2)),
-    )
+    with span("fit.direct", polynomial_order=polynomial_order) as s:
+        sol = opt.direct(
+            residual,
+            bounds,
+            maxfun=max_function_evaluations,
+            maxiter=max_iterations,
+            locally_biased=False,
+            vol_tol=1e-16 / (10 * (polynomial_order - 2)),
+        )
+        s.count("evaluations", sol.nfev)
+        s.count("iterations", sol.nit)
+        s.set(success=bool(sol.success))
     if always_optimize or (optimize_on_failure and not sol.success):
-        sol = opt.minimize(residual, sol.x, bounds=bounds, method="Nelder-Mead")
+        with span("fit.nelder_mead") as s:
+            sol = opt.minimize(residual, sol.x, bounds=bounds, method="Nelder-Mead")
+            s.count("evaluations", sol.nfev)
+            s.count("iterations", sol.nit)
     poly = Legendre([0, *sol.x])
     fine_mq = np.linspace(0, max_x, 10000)
     fit_x_mapping = poly(fine_mq)
@@ -0,0 +1,134 @@
+"""This module contains a similarity index for CSDs, built by resampling
+calibrated spectra onto a common M/Q grid."""
+
+from logging import getLogger
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sklearn.decomposition import PCA
+from sklearn.neighbors import NearestNeighbors
+from sklearn.random_projection import GaussianRandomProjection
+
+from ops.ecris.analysis.instrumentation import span
+from ops.ecris.analysis.model import CSD
+
+_log = getLogger(__name__)
+
+DEFAULT_M_OVER_Q_GRID = np.linspace(1.0, 9.0, 2000)
+
+
+def resample_csd(csd: CSD, grid: np.ndarray = DEFAULT_M_OVER_Q_GRID) -> np.ndarray:
+    """Interpolate the beam current of a calibrated CSD onto an M/Q grid.
+
+    :param csd: CSD with M/Q set
+    :param grid: increasing M/Q values to sample at
+    :return: beam current at every grid value, zero outside the CSD range
+    :rtype: np.ndarray
+    """
+    if csd.m_over_q is None:
+        raise RuntimeError("CSD m_over_q must be set")
+    m_over_q, unique_mask = np.unique(csd.m_over_q, return_index=True)
+    return np.interp(grid, m_over_q, csd.beam_current[unique_mask], left=0.0, right=0.0)
+
+
+def resample_csds(
+    csds: Iterable[CSD], grid: np.ndarray = DEFAULT_M_OVER_Q_GRID
+) -> np.ndarray:
+    """Resample CSDs onto a shared M/Q grid, one spectrum per row.
+
+    :param csds: CSDs with M/Q set
+    :param grid: increasing M/Q values to sample at
+    :return: matrix of shape ``(n_csds, len(grid))``
+    :rtype: np.ndarray
+    """
+    with span("similarity.resample") as s:
+        spectra = np.array([resample_csd(csd, grid) for csd in csds]).reshape(-1, len(grid))
+        s.count("spectra", len(spectra))
+    return spectra
+
+
+def _normalize(spectra: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(spectra, axis=1, keepdims=True)
+    return spectra / np.where(norms > 0, norms, 1.0)
+
+
+class SpectrumIndex:
+    """Nearest-neighbor index of CSD shapes.
+
+    Spectra are resampled onto a shared M/Q grid, scaled to unit norm so only
+    the shape of the distribution matters, and reduced with PCA or a random
+    projection before indexing.
+
+    :param grid: increasing M/Q values spectra are resampled on
+    :param n_components: dimension of the reduced spectra
+    :param reduction: ``"pca"`` or ``"random_projection"``
+    """
+
+    def __init__(
+        self,
+        grid: np.ndarray = DEFAULT_M_OVER_Q_GRID,
+        n_components: int = 32,
+        reduction: str = "pca",
+    ) -> None:
+        if reduction not in ("pca", "random_projection"):
+            raise RuntimeError(f"Unknown reduction {reduction}")
+        self.grid = grid
+        self.n_components = n_components
+        self.reduction = reduction
+        self.keys: List[Any] = []
+        self._reducer: Optional[PCA | GaussianRandomProjection] = None
+        self._neighbors: Optional[NearestNeighbors] = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def fit(self, spectra: np.ndarray, keys: Optional[Sequence[Any]] = None) -> "SpectrumIndex":
+        """Build the index from resampled spectra.
+
+        :param spectra: matrix from :func:`resample_csds`
+        :param keys: identifier of each spectrum, e.g. a file or timestamp,
+            defaults to the row number
+        :return: the index
+        :rtype: SpectrumIndex
+        """
+        self.keys = list(keys) if keys is not None else list(range(len(spectra)))
+        if len(self.keys) != len(spectra):
+            raise RuntimeError("Number of keys does not match the number of spectra")
+        n_components = min(self.n_components, *spectra.shape)
+        with span("similarity.fit") as s:
+            if self.reduction == "pca":
+                self._reducer = PCA(n_components=n_components, random_state=0)
+            else:
+                self._reducer = GaussianRandomProjection(
+                    n_components=n_components, random_state=0
+                )
+            reduced = self._reducer.fit_transform(_normalize(spectra))
+            self._neighbors = NearestNeighbors().fit(reduced)
+            s.count("spectra", len(spectra))
+        return self
+
+    def fit_csds(
+        self, csds: Iterable[CSD], keys: Optional[Sequence[Any]] = None
+    ) -> "SpectrumIndex":
+        return self.fit(resample_csds(csds, self.grid), keys)
+
+    def query(self, csd: CSD, k: int = 5) -> List[Tuple[Any, float]]:
+        """Find the indexed spectra most similar to a CSD.
+
+        :param csd: CSD with M/Q set
+        :param k: number of spectra to return
+        :return: ``(key, distance)`` pairs, closest first
+        :rtype: List[Tuple[Any, float]]
+        """
+        return self.query_spectra(resample_csd(csd, self.grid)[np.newaxis, :], k)[0]
+
+    def query_spectra(self, spectra: np.ndarray, k: int = 5) -> List[List[Tuple[Any, float]]]:
+        """Batch version of :meth:`query` for already resampled spectra."""
+        if self._reducer is None or self._neighbors is None:
+            raise RuntimeError("Spectrum index has not been fitted")
+        reduced = self._reducer.transform(_normalize(spectra))
+        distances, indices = self._neighbors.kneighbors(reduced, n_neighbors=min(k, len(self)))
+        return [
+            [(self.keys[i], float(d)) for i, d in zip(row_indices, row_distances)]
+            for row_indices, row_distances in zip(indices, distances)
+        ]
@@ -0,0 +1,157 @@
+"""This module maintains a columnar catalog of emittance scans and their
+RMS emittance results, so trends can be read from one small table instead
+of reloading every scan file."""
+
+import dataclasses
+import datetime as dt
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import polars as pl
+
+from ops.ecris.analysis.emittance_scan.rms_emittance import calculate_rms_emittance
+from ops.ecris.analysis.io.read_emittance_scan_file import (
+    DATETIME_FORMAT,
+    load_emittance_scan,
+)
+
+_log = logging.getLogger(__name__)
+
+RMS_COLUMNS = ["x_mean", "xp_mean", "alpha", "beta", "gamma", "e_rms"]
+
+
+def file_content_hash(filepath: Path) -> str:
+    with open(filepath, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _to_column_value(value: Any) -> Any:
+    if hasattr(value, "name") and not isinstance(value, (str, bytes)):
+        return value.name
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _catalog_row(filepath: Path, mtime: float, content_hash: str) -> Dict[str, Any]:
+    scan = load_emittance_scan(filepath, lazy=True)
+    rms = calculate_rms_emittance(scan)
+    try:
+        timestamp = dt.datetime.strptime(scan.timestamp, DATETIME_FORMAT)
+    except ValueError:
+        timestamp = None
+    row: Dict[str, Any] = {
+        "path": str(filepath),
+        "mtime": mtime,
+        "content_hash": content_hash,
+        "timestamp": timestamp,
+    }
+    for field in dataclasses.fields(scan.scan_parameters):
+        row[field.name] = _to_column_value(getattr(scan.scan_parameters, field.name))
+    row["extra_metadata"] = json.dumps(
+        {k: _to_column_value(v) for k, v in (scan.extra_metadata or {}).items()},
+        default=str,
+    )
+    for name in RMS_COLUMNS:
+        row[name] = float(getattr(rms, name))
+    return row
+
+
+def read_emittance_catalog(catalog_path: Union[str, Path]) -> pl.DataFrame:
+    """Read an emittance scan catalog.
+
+    :param catalog_path: parquet file holding the catalog
+    :return: catalog table, one row per scan
+    :rtype: pl.DataFrame
+    """
+    return pl.read_parquet(catalog_path)
+
+
+def update_emittance_catalog(
+    files: Iterable[Union[str, Path]],
+    catalog_path: Union[str, Path],
+    *,
+    max_workers: Optional[int] = None,
+) -> pl.DataFrame:
+    """Add new or changed scan files to the catalog and write it back.
+
+    A scan is only reloaded when its modification time changed and its content
+    hash no longer matches the catalog. Rows for files that no longer exist are
+    dropped.
+
+    :param files: HDF5 scan files to catalog
+    :param catalog_path: parquet file holding the catalog, created if missing
+    :param max_workers: number of threads used to process changed scans
+    :return: updated catalog table, sorted by timestamp
+    :rtype: pl.DataFrame
+    """
+    catalog_path = Path(catalog_path)
+    known: Dict[str, Dict[str, Any]] = {}
+    if catalog_path.exists():
+        known = {row["path"]: row for row in read_emittance_catalog(catalog_path).to_dicts()}
+
+    rows: List[Dict[str, Any]] = []
+    to_process = []
+    for filepath in map(Path, files):
+        mtime = filepath.stat().st_mtime
+        row = known.pop(str(filepath), None)
+        if row is not None and row["mtime"] == mtime:
+            rows.append(row)
+            continue
+        content_hash = file_content_hash(filepath)
+        if row is not None and row["content_hash"] == content_hash:
+            rows.append(row | {"mtime": mtime})
+            continue
+        to_process.append((filepath, mtime, content_hash))
+    rows.extend(row for path, row in known.items() if Path(path).exists())
+
+    def process(args) -> Dict[str, Any] | None:
+        try:
+            return _catalog_row(*args)
+        except (OSError, KeyError, RuntimeError, TypeError) as e:
+            _log.error(f"Failed to catalog scan file {args[0]}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        rows.extend(row for row in executor.map(process, to_process) if row is not None)
+    _log.info(f"Cataloged {len(to_process)} new or changed scans, {len(rows)} total")
+
+    if not rows:
+        raise RuntimeError("No emittance scans to catalog")
+    catalog = pl.from_dicts(rows, infer_schema_length=None).sort("timestamp")
+    temporary_path = catalog_path.with_suffix(".tmp")
+    catalog.write_parquet(temporary_path)
+    os.replace(temporary_path, catalog_path)
+    return catalog
+
+
+def join_venus_data(
+    catalog: pl.DataFrame,
+    venus_data: pd.DataFrame,
+    tolerance: dt.timedelta = dt.timedelta(minutes=1),
+) -> pd.DataFrame:
+    """Attach the nearest VENUS data sample to each cataloged scan.
+
+    :param catalog: emittance scan catalog
+    :param venus_data: VENUS data as returned by ``get_venus_data``
+    :param tolerance: maximum time between a scan and its VENUS sample
+    :return: catalog rows with the matching VENUS columns appended
+    :rtype: pd.DataFrame
+    """
+    scans = catalog.to_pandas().dropna(subset=["timestamp"]).sort_values("timestamp")
+    venus_data = venus_data.sort_values("time")
+    return pd.merge_asof(
+        scans,
+        venus_data,
+        left_on="timestamp",
+        right_on="time",
+        direction="nearest",
+        tolerance=pd.Timedelta(tolerance),
+    )
@@ -2,8 +2,13 @@ from dataclasses import dataclass
 
 import numpy as np
 
-from ops.ecris.analysis.model.emittance_scan import EmittanceScan
+from ops.ecris.analysis.model.emittance_scan import (
+    EmittanceScan,
+    scan_divergence_range,
+    scan_position_range,
+)
 from ops.ecris.devices.motor_controller_specification import Axis
+from ops.ecris.operations.emittance_scan.parameters import LinearScanParameters
 
 
 @dataclass
@@ -45,3 +50,97 @@ def calculate_rms_emittance(emittance_scan: EmittanceScan) -> RMSEmittance:
     beta = sigma_x_2 / e_rms
     gamma = sigma_xp_2 / e_rms
     return RMSEmittance(data, axis, x, xp, x_mean, xp_mean, alpha, beta, gamma, e_rms)
+
+
+class RMSEmittanceAccumulator:
+    """Running RMS emittance of a linear scan that is still in progress.
+
+    Scan rows or single points can be added in any order as they are measured,
+    each update costs O(row) and a partial result is available at any time.
+    Once every row has been added, :meth:`result` matches
+    :func:`calculate_rms_emittance` on the complete scan.
+
+    :param scan_parameters: parameters of the scan being measured
+    """
+
+    def __init__(self, scan_parameters: LinearScanParameters) -> None:
+        self.axis: Axis = scan_parameters.axis
+        self.x = scan_position_range(scan_parameters)
+        self.xp = scan_divergence_range(scan_parameters)
+        self.data = np.zeros((len(self.x), len(self.xp)))
+        # moments are accumulated about the grid centre to limit cancellation
+        self._x0 = 0.5 * (self.x[0] + self.x[-1]) * 1e-3
+        self._xp0 = 0.5 * (self.xp[0] + self.xp[-1]) * 1e-3
+        self._dx = self.x * 1e-3 - self._x0
+        self._dxp = self.xp * 1e-3 - self._xp0
+        # sum(w), sum(w x), sum(w xp), sum(w x^2), sum(w xp^2), sum(w x xp)
+        self._moments = np.zeros(6)
+
+    def position_index(self, position: float) -> int:
+        return int(np.argmin(np.abs(self.x - position)))
+
+    def divergence_index(self, divergence: float) -> int:
+        return int(np.argmin(np.abs(self.xp - divergence)))
+
+    def _row_moments(self, position_index: int, row: np.ndarray) -> np.ndarray:
+        dx = self._dx[position_index]
+        w = np.sum(row)
+        w_xp = np.dot(row, self._dxp)
+        w_xp_2 = np.dot(row, self._dxp * self._dxp)
+        return np.array([w, w * dx, w_xp, w * dx * dx, w_xp_2, dx * w_xp])
+
+    def add_row(self, position_index: int, row: np.ndarray) -> None:
+        """Set the measured row at a scan position, replacing any earlier row.
+
+        :param position_index: index of the position in the scan grid
+        :param row: beam current at every divergence of the scan grid
+        """
+        row = np.clip(np.asarray(row, dtype=float), 0, None)
+        if row.shape != self.xp.shape:
+            raise RuntimeError(f"Row has shape {row.shape}, expected {self.xp.shape}")
+        self._moments += self._row_moments(position_index, row) - self._row_moments(
+            position_index, self.data[position_index]
+        )
+        self.data[position_index] = row
+
+    def add_point(self, position_index: int, divergence_index: int, value: float) -> None:
+        """Set a single measured point, replacing any earlier value.
+
+        :param position_index: index of the position in the scan grid
+        :param divergence_index: index of the divergence in the scan grid
+        :param value: measured beam current
+        """
+        value = max(float(value), 0.0)
+        w = value - self.data[position_index, divergence_index]
+        dx = self._dx[position_index]
+        dxp = self._dxp[divergence_index]
+        self._moments += w * np.array([1.0, dx, dxp, dx * dx, dxp * dxp, dx * dxp])
+        self.data[position_index, divergence_index] = value
+
+    def result(self) -> RMSEmittance:
+        """RMS emittance and Twiss parameters of the data added so far.
+
+        :return: RMS emittance of the accumulated data
+        :rtype: RMSEmittance
+        """
+        w, w_x, w_xp, w_x_2, w_xp_2, w_xxp = self._moments
+        if w <= 0:
+            raise RuntimeError("No beam current accumulated, cannot calculate emittance")
+        x_offset = w_x / w
+        xp_offset = w_xp / w
+        sigma_x_2 = w_x_2 / w - x_offset * x_offset
+        sigma_xp_2 = w_xp_2 / w - xp_offset * xp_offset
+        sigma_xxp = w_xxp / w - x_offset * xp_offset
+        e_rms = np.sqrt(sigma_x_2 * sigma_xp_2 - np.power(sigma_xxp, 2))
+        return RMSEmittance(
+            self.data.copy(),
+            self.axis,
+            self.x,
+            self.xp,
+            self._x0 + x_offset,
+            self._xp0 + xp_offset,
+            -sigma_xxp / e_rms,
+            sigma_x_2 / e_rms,
+            sigma_xp_2 / e_rms,
+            e_rms,
+        )
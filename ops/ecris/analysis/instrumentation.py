@@ -0,0 +1,220 @@
+"""Opt-in timing spans and counters for the analysis package.
+
+Instrumentation is disabled by default; while disabled, :func:`span` returns a
+shared no-op object so instrumented code pays only for one function call.
+Enable it around a run and export the collected statistics afterwards::
+
+    from ops.ecris.analysis import instrumentation
+
+    instrumentation.enable(log_spans=True)
+    ...
+    instrumentation.write_summary(Path("profile.json"))
+"""
+
+import functools
+import json
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+_log = getLogger(__name__)
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+_enabled: bool = False
+_log_spans: bool = False
+_track_memory: bool = False
+_lock = threading.Lock()
+
+
+@dataclass
+class SpanStatistics:
+    count: int = 0
+    total_s: float = 0.0
+    min_s: float = float("inf")
+    max_s: float = 0.0
+    memory_delta_bytes: int = 0
+    counters: Dict[str, float] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {
+            "count": self.count,
+            "total_s": self.total_s,
+            "mean_s": self.total_s / self.count if self.count else 0.0,
+            "min_s": self.min_s if self.count else 0.0,
+            "max_s": self.max_s,
+            "counters": dict(self.counters),
+        }
+        if _track_memory:
+            summary["memory_delta_bytes"] = self.memory_delta_bytes
+        return summary
+
+
+_spans: Dict[str, SpanStatistics] = {}
+_counters: Dict[str, float] = {}
+
+
+class _NullSpan:
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def count(self, name: str, value: float = 1) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """A timed section of code, created by :func:`span`."""
+
+    def __init__(self, name: str, attributes: Dict[str, Any]) -> None:
+        self.name = name
+        self.attributes = attributes
+        self.counters: Dict[str, float] = {}
+        self._start = 0.0
+        self._memory_start = 0
+
+    def set(self, **attributes: Any) -> None:
+        """Attach attributes to the structured log record of this span."""
+        self.attributes.update(attributes)
+
+    def count(self, name: str, value: float = 1) -> None:
+        """Add to a counter that is summed over every call of this span."""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def __enter__(self) -> "Span":
+        if _track_memory:
+            self._memory_start = tracemalloc.get_traced_memory()[0]
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        duration = time.perf_counter() - self._start
+        memory_delta = 0
+        if _track_memory:
+            memory_delta = tracemalloc.get_traced_memory()[0] - self._memory_start
+        with _lock:
+            stats = _spans.setdefault(self.name, SpanStatistics())
+            stats.count += 1
+            stats.total_s += duration
+            stats.min_s = min(stats.min_s, duration)
+            stats.max_s = max(stats.max_s, duration)
+            stats.memory_delta_bytes += memory_delta
+            for name, value in self.counters.items():
+                stats.counters[name] = stats.counters.get(name, 0) + value
+        if _log_spans:
+            record = {"span": self.name, "duration_s": duration,
+                      **self.attributes, **self.counters}
+            if exc_type is not None:
+                record["error"] = exc_type.__name__
+            _log.info(json.dumps(record, default=str), extra={"instrumentation": record})
+
+
+def enable(log_spans: bool = False, track_memory: bool = False) -> None:
+    """Start collecting spans and counters.
+
+    :param log_spans: emit a JSON log record at the end of every span
+    :param track_memory: record the traced memory change of every span, this
+        starts ``tracemalloc`` and slows down allocation-heavy code
+    """
+    global _enabled, _log_spans, _track_memory
+    _log_spans = log_spans
+    _track_memory = track_memory
+    if track_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _enabled = True
+
+
+def disable() -> None:
+    """Stop collecting, keeping what was collected so far."""
+    global _enabled
+    _enabled = False
+    if _track_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+def span(name: str, **attributes: Any) -> Span | _NullSpan:
+    """Time a section of code under ``name``.
+
+    :param name: dotted span name, e.g. ``io.read_parquet``
+    :return: context manager yielding the span, or a no-op when disabled
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return Span(name, attributes)
+
+
+def count(name: str, value: float = 1) -> None:
+    """Add to a global counter."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def instrumented(name: Optional[str] = None) -> Callable[[_F], _F]:
+    """Decorate a function so every call is recorded as a span."""
+
+    def decorate(function: _F) -> _F:
+        span_name = name or f"{function.__module__}.{function.__qualname__}"
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with Span(span_name, {}):
+                return function(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def summary() -> Dict[str, Any]:
+    """Collected span statistics and counters.
+
+    :return: ``{"spans": {name: statistics}, "counters": {name: value}}``
+    :rtype: Dict[str, Any]
+    """
+    with _lock:
+        return {
+            "spans": {name: stats.as_dict() for name, stats in sorted(_spans.items())},
+            "counters": dict(sorted(_counters.items())),
+        }
+
+
+def write_summary(path: Path) -> None:
+    with open(path, "w") as f:
+        json.dump(summary(), f, indent=2)
+
+
+def log_summary() -> None:
+    """Log one line per span, slowest first."""
+    spans = summary()["spans"]
+    for name, stats in sorted(spans.items(), key=lambda s: -s[1]["total_s"]):
+        counters = " ".join(f"{k}={v:g}" for k, v in stats["counters"].items())
+        _log.info(f"{name}: {stats['count']} calls, {stats['total_s']:.3f} s total, "
+                  f"{stats['mean_s'] * 1e3:.2f} ms mean {counters}".rstrip())
+    for name, value in summary()["counters"].items():
+        _log.info(f"{name}: {value:g}")
@@ -1,2 +1,36 @@
-from .read_csd_file import read_csd_from_file_pair
-from .convert_venus_data import convert_venus_db_files
+from typing import TYPE_CHECKING
+
+from ops.ecris.analysis._lazy import lazy_imports
+
+_LAZY_IMPORTS = {
+    "read_csd_from_file_pair": ".read_csd_file",
+    "convert_venus_db_files": ".convert_venus_data",
+    "EncodingProfile": ".convert_venus_data",
+    "ENCODING_PROFILES": ".convert_venus_data",
+    "compare_encoding_profiles": ".convert_venus_data",
+    "prefetch": ".read_ahead",
+    "prefetch_csd_files": ".read_ahead",
+    "prefetch_emittance_scans": ".read_ahead",
+    "prefetch_venus_files": ".read_ahead",
+    "prefetch_venus_timeframe": ".read_ahead",
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+if TYPE_CHECKING:
+    from .convert_venus_data import (
+        ENCODING_PROFILES,
+        EncodingProfile,
+        compare_encoding_profiles,
+        convert_venus_db_files,
+    )
+    from .read_ahead import (
+        prefetch,
+        prefetch_csd_files,
+        prefetch_emittance_scans,
+        prefetch_venus_files,
+        prefetch_venus_timeframe,
+    )
+    from .read_csd_file import read_csd_from_file_pair
+
+__getattr__, __dir__ = lazy_imports(globals(), _LAZY_IMPORTS)
@@ -4,10 +4,15 @@
 import polars as pl
 import sqlite3
 import numpy as np
+from dataclasses import dataclass
 from datetime import datetime
 import shutil
+import tempfile
+import time
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional, Tuple
+
+from ops.ecris.analysis.instrumentation import count, span
 
 TIME_NAME = "unix_epoch_milliseconds"
 
@@ -20,6 +25,85 @@ RENAME_DICT = {
     'unix_epoch_microseconds': TIME_NAME
 }
 
+@dataclass(frozen=True)
+class EncodingProfile:
+    """Storage encoding of converted VENUS parquet files.
+
+    :param compression: parquet compression codec
+    :param compression_level: codec level, the codec default when not given
+    :param row_group_size: rows per row group, the writer default when not given
+    :param float32: store float channels as float32, except ``float64_columns``
+    :param float64_columns: float columns kept at full precision, e.g. the time stamps
+    :param byte_stream_split: use byte-stream-split encoding for float columns,
+        which usually compresses slowly varying channels better
+    :param null_filler: store columns that are entirely NaN, such as the filler
+        columns added to align schemas, as nulls
+    """
+
+    compression: str = "zstd"
+    compression_level: Optional[int] = None
+    row_group_size: Optional[int] = None
+    float32: bool = False
+    float64_columns: Tuple[str, ...] = ("time",)
+    byte_stream_split: bool = False
+    null_filler: bool = False
+
+
+ENCODING_PROFILES: Dict[str, EncodingProfile] = {
+    "default": EncodingProfile(),
+    "compact": EncodingProfile(
+        compression_level=9,
+        row_group_size=1_000_000,
+        float32=True,
+        byte_stream_split=True,
+        null_filler=True,
+    ),
+    "fast_read": EncodingProfile(
+        compression="lz4",
+        row_group_size=128 * 1024,
+        null_filler=True,
+    ),
+}
+
+
+def get_encoding_profile(profile: str | EncodingProfile) -> EncodingProfile:
+    if isinstance(profile, EncodingProfile):
+        return profile
+    if profile not in ENCODING_PROFILES:
+        raise RuntimeError(f"Unknown encoding profile {profile}, "
+                           f"expected one of {list(ENCODING_PROFILES)}")
+    return ENCODING_PROFILES[profile]
+
+
+def write_venus_parquet(df: pl.DataFrame, filename: Path,
+                        profile: str | EncodingProfile = "default"):
+    profile = get_encoding_profile(profile)
+    float_columns = [k for k, dtype in df.schema.items() if dtype.is_float()]
+    if profile.null_filler:
+        filler = [k for k in float_columns if df[k].is_nan().all()]
+        df = df.with_columns(pl.lit(None, dtype=df[k].dtype).alias(k) for k in filler)
+    if profile.float32:
+        df = df.with_columns(
+            pl.col(k).cast(pl.Float32) for k in float_columns if k not in profile.float64_columns
+        )
+    pyarrow_options = None
+    if profile.byte_stream_split:
+        # dictionary encoding takes precedence over byte-stream-split, so it is
+        # only used for the other columns
+        pyarrow_options = {
+            "use_byte_stream_split": float_columns,
+            "use_dictionary": [k for k in df.columns if k not in float_columns],
+        }
+    df.write_parquet(
+        filename,
+        compression=profile.compression,
+        compression_level=profile.compression_level,
+        row_group_size=profile.row_group_size,
+        use_pyarrow=pyarrow_options is not None,
+        pyarrow_options=pyarrow_options,
+    )
+
+
 def get_table_names(file):
     query = "SELECT name FROM sqlite_master WHERE type='table';"
     return pl.read_database_uri(query=query, uri=f"sqlite://{file}")["name"]
@@ -60,20 +144,24 @@ def all_unique_column_names(files: List[Path]):
     return all_unique
 
 def read_full_db(file_name):
-    table_names = get_table_names(file_name)
-    dfs = []
-    for name in table_names:
-        query = f"SELECT * FROM {name}"
-        dfs.append(
-            pl.read_database_uri(query=query, uri=f"sqlite://{file_name}")
-        )
-    df = pl.concat(dfs, how="align")
+    with span("io.read_sqlite", file=str(file_name)) as s:
+        table_names = get_table_names(file_name)
+        dfs = []
+        for name in table_names:
+            query = f"SELECT * FROM {name}"
+            dfs.append(
+                pl.read_database_uri(query=query, uri=f"sqlite://{file_name}")
+            )
+        df = pl.concat(dfs, how="align")
+        s.count("tables", len(dfs))
+        s.count("rows", df.height)
     for k, v in RENAME_DICT.items():
         if k in df:
             df = df.rename({k: v})
     return df.sort(by=TIME_NAME)
 
-def write_chunked(output: Path, df, interval="1d"):
+def write_chunked(output: Path, df, interval="1d",
+                  profile: str | EncodingProfile = "default"):
     output.mkdir(exist_ok=True)
     start_time = datetime.fromtimestamp(float(df[TIME_NAME].min()) / 1000)
     stop_time = datetime.fromtimestamp(float(df[TIME_NAME].max()) / 1000)
@@ -84,14 +172,18 @@ def write_chunked(output: Path, df, interval="1d"):
             (pl.col(TIME_NAME) > int(start.timestamp() * 1000)) & (pl.col(TIME_NAME) <= int(stop.timestamp() * 1000))
         )
         if not selection.is_empty():
-            selection.write_parquet(
-                output / f"venus_data_{start.strftime('%Y_%m_%d_%H_%M_%S')}.parquet")
+            with span("io.write_parquet") as s:
+                write_venus_parquet(
+                    selection,
+                    output / f"venus_data_{start.strftime('%Y_%m_%d_%H_%M_%S')}.parquet",
+                    profile)
+                s.count("rows", selection.height)
         else:
             print(f"WARNING: Selection {start} to {stop} is empty")
     return time_chunks
 
 def convert_venus_db_files(files: List[Path], output_path=Path("./data/venus"), 
-                           *, overwrite = False):
+                           *, overwrite = False, profile: str | EncodingProfile = "default"):
     column_names = union_of_column_names(files)
     column_names.add("time")
     skipped = 0
@@ -116,14 +208,20 @@ def convert_venus_db_files(files: List[Path], output_path=Path("./data/venus"),
                     if k not in column_names:
                         df = df.drop(k)
                         print(f"WARNING: Removing column {k}")
-                df.write_parquet(filename)
+                with span("io.write_parquet", file=str(filename)) as s:
+                    write_venus_parquet(df, filename, profile)
+                    s.count("rows", df.height)
+                count("convert.files_converted")
             except BaseException as e:
                 print(f"Conversion failed: {e}")
                 failed += 1
+    count("convert.files_skipped", skipped)
+    count("convert.files_failed", failed)
     print("File conversion complete." + (f" Skipped: {skipped}/{len(files)}." if skipped else "")
           + (f" Failed: {failed}/{len(files)}." if failed else ""))
 
-def convert_directory(files: List[Path], output_path=Path("./data_full"), interval="1d"):
+def convert_directory(files: List[Path], output_path=Path("./data_full"), interval="1d",
+                      profile: str | EncodingProfile = "default"):
     all_times = []
     column_names = union_of_column_names(files)
     column_names.add("time")
@@ -144,6 +242,74 @@ def convert_directory(files: List[Path], output_path=Path("./data_full"), interv
                 if k not in column_names:
                     df = df.drop(k)
                     print(f"WARNING: Removing column {k}")
-            time_chunks = write_chunked(output_path, df, interval=interval)
+            time_chunks = write_chunked(output_path, df, interval=interval, profile=profile)
             all_times.append(time_chunks)
-    return all_times
\ No newline at end of file
+    return all_times
+
+
+def compare_encoding_profiles(files: List[Path],
+                              profiles: Optional[Dict[str, EncodingProfile]] = None,
+                              *, columns: Optional[List[str]] = None, repeats: int = 3,
+                              output_path: Optional[Path] = None) -> pl.DataFrame:
+    """Rewrite converted VENUS files with each encoding profile and measure the result.
+
+    :param files: converted VENUS parquet files
+    :param profiles: profiles to compare, all of ``ENCODING_PROFILES`` when not given
+    :param columns: columns read in the column read test, e.g. the channels of a
+        typical plot, skipped when not given
+    :param repeats: number of timed reads, the fastest is reported
+    :param output_path: directory the rewritten files are kept in, a temporary
+        directory when not given
+    :return: one row per profile with the size on disk, the write and read times,
+        the read throughput of the decoded data and the largest relative change
+        of any value
+    :rtype: pl.DataFrame
+    """
+    profiles = ENCODING_PROFILES if profiles is None else profiles
+    frames = {file: pl.read_parquet(file) for file in files}
+    decoded_bytes = sum(df.estimated_size() for df in frames.values())
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, profile in profiles.items():
+            directory = (output_path if output_path is not None else Path(tmp)) / name
+            directory.mkdir(parents=True, exist_ok=True)
+            written = [directory / file.name for file in frames]
+            t = time.perf_counter()
+            for df, filename in zip(frames.values(), written):
+                write_venus_parquet(df, filename, profile)
+            write_s = time.perf_counter() - t
+
+            read_s = float("inf")
+            for _ in range(repeats):
+                t = time.perf_counter()
+                read = [pl.read_parquet(f) for f in written]
+                read_s = min(read_s, time.perf_counter() - t)
+            max_error = 0.0
+            for original, df in zip(frames.values(), read):
+                for k, dtype in original.schema.items():
+                    if dtype.is_float():
+                        a = original[k].fill_nan(None).cast(pl.Float64)
+                        b = df[k].fill_nan(None).cast(pl.Float64)
+                        error = ((a - b).abs() / a.abs()).filter(a != 0).max()
+                        max_error = max(max_error, error or 0.0)
+            row = {
+                "profile": name,
+                "bytes": sum(f.stat().st_size for f in written),
+                "write_s": write_s,
+                "read_s": read_s,
+                "read_mb_per_s": decoded_bytes / read_s / 2**20,
+                "max_relative_error": max_error,
+            }
+            if columns is not None:
+                columns_s = float("inf")
+                for _ in range(repeats):
+                    t = time.perf_counter()
+                    pl.scan_parquet(written).select(columns).collect()
+                    columns_s = min(columns_s, time.perf_counter() - t)
+                row["read_columns_s"] = columns_s
+            rows.append(row)
+    result = pl.DataFrame(rows)
+    if "default" in profiles:
+        default_bytes = result.filter(pl.col("profile") == "default")["bytes"][0]
+        result = result.with_columns(size_ratio=pl.col("bytes") / default_bytes)
+    return result
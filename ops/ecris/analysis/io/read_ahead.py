@@ -0,0 +1,155 @@
+"""Bounded read-ahead of input files on background threads.
+
+The loaders in this package spend most of their time waiting on the file
+system, so reading item N+k on a thread while item N is analyzed keeps the
+analysis busy. Results are delivered in input order.
+"""
+
+import sys
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+from ops.ecris.analysis.instrumentation import span
+from ops.ecris.analysis.io.read_csd_file import read_csd_from_file_pair
+from ops.ecris.analysis.model import CSD
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def result_nbytes(result: Any) -> int:
+    """Approximate in-memory size of a loaded item.
+
+    Lazily loaded emittance scans count as empty until their data is read.
+    """
+    if isinstance(result, np.ndarray):
+        return result.nbytes
+    if isinstance(result, CSD):
+        m_over_q = result.m_over_q
+        return result.data.nbytes + (m_over_q.nbytes if m_over_q is not None else 0)
+    if hasattr(result, "estimated_size"):
+        return int(result.estimated_size())
+    if hasattr(result, "memory_usage"):
+        return int(result.memory_usage(deep=False).sum())
+    data = getattr(result, "_data", None)
+    if isinstance(data, np.ndarray):
+        return data.nbytes
+    return sys.getsizeof(result)
+
+
+def prefetch(
+    items: Iterable[T],
+    loader: Callable[[T], R],
+    *,
+    depth: int = 4,
+    max_bytes: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    size_of: Callable[[R], int] = result_nbytes,
+) -> Iterator[Tuple[T, R]]:
+    """Load items ahead of the consumer on a thread pool.
+
+    At most ``depth`` items are being read or waiting to be consumed at any
+    time. When ``max_bytes`` is set, no new reads start while the results that
+    are loaded or in flight are estimated to use that much memory; reads in
+    flight are counted at the mean size of the results seen so far. An
+    exception raised by the loader is raised when its item is reached.
+
+    :param items: items to load, e.g. file paths
+    :param loader: function loading one item
+    :param depth: maximum number of items read ahead
+    :param max_bytes: memory budget for loaded, unconsumed results
+    :param max_workers: number of reader threads, defaults to ``depth``
+    :param size_of: function returning the size of a result in bytes
+    :return: iterator of ``(item, result)`` pairs, in input order
+    :rtype: Iterator[Tuple[T, R]]
+    """
+    if depth < 1:
+        raise ValueError("Prefetch depth must be at least 1")
+    remaining = iter(items)
+    pending: Deque[Tuple[T, Future]] = deque()
+    executor = ThreadPoolExecutor(max_workers=max_workers or depth)
+    seen_bytes = 0
+    seen_count = 0
+
+    def buffered_bytes() -> float:
+        mean_size = seen_bytes / seen_count
+        return sum(
+            size_of(future.result()) if future.done() and future.exception() is None
+            else mean_size
+            for _, future in pending
+        )
+
+    def fill() -> None:
+        while len(pending) < depth:
+            if max_bytes is not None and pending and (
+                seen_count == 0 or buffered_bytes() >= max_bytes
+            ):
+                return
+            try:
+                item = next(remaining)
+            except StopIteration:
+                return
+            pending.append((item, executor.submit(loader, item)))
+
+    try:
+        fill()
+        while pending:
+            item, future = pending.popleft()
+            with span("io.prefetch_wait") as s:
+                s.count("blocked", 0 if future.done() else 1)
+                result = future.result()
+            if max_bytes is not None:
+                seen_bytes += size_of(result)
+                seen_count += 1
+            fill()
+            yield item, result
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def prefetch_csd_files(files: Iterable[Path], **kwargs) -> Iterator[Tuple[Path, CSD]]:
+    """Read CSD files ahead of the consumer, see :func:`prefetch`."""
+    return prefetch(files, read_csd_from_file_pair, **kwargs)
+
+
+def prefetch_emittance_scans(files: Iterable[Path], **kwargs) -> Iterator[Tuple[Path, Any]]:
+    """Read emittance scan files, including their scan data, ahead of the consumer.
+
+    See :func:`prefetch`.
+    """
+    from ops.ecris.analysis.io.read_emittance_scan_file import load_emittance_scan
+
+    return prefetch(files, partial(load_emittance_scan, lazy=False), **kwargs)
+
+
+def prefetch_venus_files(
+    files: Iterable[Path], columns: Optional[List[str]] = None, **kwargs
+) -> Iterator[Tuple[Path, Any]]:
+    """Read converted VENUS parquet files ahead of the consumer.
+
+    :param files: parquet files, e.g. from ``files_in_timeframe``
+    :param columns: columns to read, all columns when not given
+    :return: iterator of ``(file, DataFrame)`` pairs, see :func:`prefetch`
+    """
+    import pandas as pd
+
+    return prefetch(files, partial(pd.read_parquet, columns=columns), **kwargs)
+
+
+def prefetch_venus_timeframe(
+    path: Path, start: datetime, stop: datetime, **kwargs
+) -> Iterator[Tuple[Path, Any]]:
+    """Read the converted VENUS files covering a time span, one file at a time.
+
+    See :func:`prefetch_venus_files`.
+    """
+    from ops.ecris.analysis.venus_data import files_in_timeframe
+
+    files = files_in_timeframe(path.glob("*.parquet"), start, stop)
+    return prefetch_venus_files(files, **kwargs)
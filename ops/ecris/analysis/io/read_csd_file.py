@@ -4,6 +4,7 @@ from pathlib import Path
 
 import numpy as np
 
+from ops.ecris.analysis.instrumentation import span
 from ops.ecris.analysis.model import CSD
 
 DATETIME_FORMAT: str = "%Y-%m-%d %H:%M:%S"
@@ -24,7 +25,9 @@ def _file_formatted_timestamp(file: Path) -> str:
         
 
 def read_csd_from_file_pair(csd_file: Path) -> CSD:
-    data = np.loadtxt(csd_file)
+    with span("io.read_csd", file=str(csd_file)) as s:
+        data = np.loadtxt(csd_file)
+        s.count("rows", len(data))
     timestamp = _file_formatted_timestamp(csd_file)
     settings = {}
     datasheet = csd_file.with_name(csd_file.name.replace('csd', 'dsht')) 
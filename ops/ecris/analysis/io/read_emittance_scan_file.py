@@ -1,17 +1,23 @@
 import dataclasses
 import datetime as dt
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Tuple, Dict, Any, Union
+from typing import Tuple, Dict, Any, Union, Iterable, List, Optional
 
 import h5py
 import numpy as np
 
 from ops.ecris.operations.emittance_scan.parameters import LinearScanParameters
 from ops.ecris.devices.motor_controller_specification import Axis
-from ops.ecris.analysis.model.emittance_scan import EmittanceScan
+from ops.ecris.analysis.instrumentation import span
+from ops.ecris.analysis.model.emittance_scan import EmittanceScan, LazyEmittanceScan
 
 DATETIME_FORMAT: str = "%Y-%m-%d %H:%M:%S"
+SCAN_FILE_PATTERN: str = "emittance_scan_*.h5"
+
+_PARAMETER_FIELDS = {field.name for field in dataclasses.fields(LinearScanParameters)}
 
 
 def _file_raw_timestamp(file: Path) -> float | None:
@@ -30,27 +36,20 @@ def _file_formatted_timestamp(file: Path) -> str:
         return "UNKNOWN"
 
 
-def load_emittance_scan(filepath: Union[str, Path]) -> EmittanceScan:
-    filepath = Path(filepath)
-    if not filepath.exists():
-        raise FileNotFoundError(f"Scan file not found: {filepath}")
-
-    with h5py.File(filepath, "r") as f:
-        if "scan_data" not in f:
-            raise KeyError(f"File {filepath} does not contain a 'scan_data' dataset.")
-        dataset = f["scan_data"]
-        data = dataset[:]
-        raw_attrs = dict(dataset.attrs)
-
-    timestamp = _file_raw_timestamp(filepath)
+def _scan_dataset(f: h5py.File, filepath: Path) -> h5py.Dataset:
+    if "scan_data" not in f:
+        raise KeyError(f"File {filepath} does not contain a 'scan_data' dataset.")
+    return f["scan_data"]
 
-    param_fields = {field.name for field in dataclasses.fields(LinearScanParameters)}
 
+def _parse_attributes(
+    raw_attrs: Dict[str, Any],
+) -> Tuple[LinearScanParameters, Dict[str, Any]]:
     constructor_args = {}
     extra_metadata = {}
 
     for key, value in raw_attrs.items():
-        if value == "None":
+        if isinstance(value, str) and value == "None":
             value = None
 
         if key == "axis" and isinstance(value, str):
@@ -59,16 +58,174 @@ def load_emittance_scan(filepath: Union[str, Path]) -> EmittanceScan:
             except KeyError:
                 pass
 
-        if key in param_fields:
+        if key in _PARAMETER_FIELDS:
             constructor_args[key] = value
         else:
             extra_metadata[key] = value
 
-    parameters = LinearScanParameters(**constructor_args)
+    return LinearScanParameters(**constructor_args), extra_metadata
+
+
+def read_scan_data(filepath: Union[str, Path], memory_map: bool = True) -> np.ndarray:
+    """Read the scan data array of an emittance scan file.
 
+    Contiguous, uncompressed datasets are memory-mapped so that only the pages
+    that are actually used get read from disk; other layouts are read in full.
+
+    :param filepath: path to the HDF5 scan file
+    :param memory_map: try to memory-map the dataset instead of reading it
+    :return: scan data array
+    :rtype: np.ndarray
+    """
+    filepath = Path(filepath)
+    with span("io.read_emittance_scan_data", file=str(filepath)) as s, h5py.File(
+        filepath, "r"
+    ) as f:
+        dataset = _scan_dataset(f, filepath)
+        offset = dataset.id.get_offset()
+        if (
+            memory_map
+            and offset is not None
+            and dataset.chunks is None
+            and dataset.compression is None
+            and dataset.dtype.kind in "iuf"
+        ):
+            shape, dtype = dataset.shape, dataset.dtype
+            s.count("memory_mapped")
+        else:
+            data = dataset[:]
+            s.count("bytes", data.nbytes)
+            return data
+    return np.memmap(filepath, mode="r", dtype=dtype, shape=shape, offset=offset)
+
+
+def read_scan_header(
+    filepath: Union[str, Path],
+) -> Tuple[LinearScanParameters, Dict[str, Any]]:
+    """Read the scan parameters and extra metadata without touching the scan data.
+
+    :param filepath: path to the HDF5 scan file
+    :return: scan parameters and extra metadata
+    :rtype: Tuple[LinearScanParameters, Dict[str, Any]]
+    """
+    filepath = Path(filepath)
+    with span("io.read_emittance_scan_header"), h5py.File(filepath, "r") as f:
+        raw_attrs = dict(_scan_dataset(f, filepath).attrs)
+    return _parse_attributes(raw_attrs)
+
+
+def load_emittance_scan(filepath: Union[str, Path], *, lazy: bool = False) -> EmittanceScan:
+    """Load an emittance scan from an HDF5 file.
+
+    :param filepath: path to the HDF5 scan file
+    :param lazy: defer reading the scan data until it is first accessed
+    :return: the emittance scan
+    :rtype: EmittanceScan
+    """
+    filepath = Path(filepath)
+    if not filepath.exists():
+        raise FileNotFoundError(f"Scan file not found: {filepath}")
+
+    parameters, extra_metadata = read_scan_header(filepath)
+    return _build_scan(filepath, parameters, extra_metadata, lazy)
+
+
+def _build_scan(
+    filepath: Path,
+    parameters: LinearScanParameters,
+    extra_metadata: Dict[str, Any],
+    lazy: bool,
+) -> EmittanceScan:
+    timestamp = _file_formatted_timestamp(filepath)
+    if lazy:
+        return LazyEmittanceScan(
+            timestamp=timestamp,
+            data_loader=partial(read_scan_data, filepath),
+            scan_parameters=parameters,
+            extra_metadata=extra_metadata if extra_metadata else None,
+        )
     return EmittanceScan(
-        data=data,
+        data=read_scan_data(filepath, memory_map=False),
         scan_parameters=parameters,
         timestamp=timestamp,
         extra_metadata=extra_metadata if extra_metadata else None,
     )
+
+
+def _matches(
+    parameters: LinearScanParameters,
+    axis: Optional[Axis | str],
+    parameter_ranges: Optional[Dict[str, Tuple[float, float]]],
+) -> bool:
+    if axis is not None:
+        scan_axis = parameters.axis
+        if isinstance(axis, str):
+            scan_axis = getattr(scan_axis, "name", scan_axis)
+        if scan_axis != axis:
+            return False
+    for name, (low, high) in (parameter_ranges or {}).items():
+        value = getattr(parameters, name)
+        if value is None or not low <= value <= high:
+            return False
+    return True
+
+
+def _load_if_matching(
+    filepath: Path,
+    axis: Optional[Axis | str],
+    parameter_ranges: Optional[Dict[str, Tuple[float, float]]],
+    lazy: bool,
+) -> EmittanceScan | None:
+    # unreadable headers and scan data both skip the file instead of failing the batch
+    try:
+        parameters, extra_metadata = read_scan_header(filepath)
+        if not _matches(parameters, axis, parameter_ranges):
+            return None
+        return _build_scan(filepath, parameters, extra_metadata, lazy)
+    except (OSError, KeyError, TypeError, ValueError) as e:
+        logging.error(f"Failed to read scan file {filepath}: {e}")
+        return None
+
+
+def load_emittance_scans(
+    files: Iterable[Union[str, Path]],
+    *,
+    axis: Optional[Axis | str] = None,
+    parameter_ranges: Optional[Dict[str, Tuple[float, float]]] = None,
+    lazy: bool = True,
+    max_workers: Optional[int] = None,
+) -> List[EmittanceScan]:
+    """Load many emittance scans in parallel, filtering on their headers.
+
+    Only the dataset attributes are read to decide whether a scan matches, so
+    rejected scans never have their scan data read. Files whose header or, when
+    not lazy, scan data cannot be read are logged and skipped.
+
+    :param files: HDF5 scan files to load
+    :param axis: only keep scans along this axis (``Axis`` member or its name)
+    :param parameter_ranges: inclusive ``(min, max)`` ranges keyed by
+        ``LinearScanParameters`` field name
+    :param lazy: defer reading scan data until it is first accessed
+    :param max_workers: number of reader threads
+    :return: matching scans, in the order of ``files``
+    :rtype: List[EmittanceScan]
+    """
+    loader = partial(
+        _load_if_matching, axis=axis, parameter_ranges=parameter_ranges, lazy=lazy
+    )
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        scans = executor.map(loader, [Path(f) for f in files])
+        return [s for s in scans if s is not None]
+
+
+def load_emittance_scan_directory(
+    directory: Union[str, Path], pattern: str = SCAN_FILE_PATTERN, **kwargs
+) -> List[EmittanceScan]:
+    """Load all emittance scans in a directory, see :func:`load_emittance_scans`.
+
+    :param directory: directory containing HDF5 scan files
+    :param pattern: glob pattern selecting scan files
+    :return: matching scans, sorted by file name
+    :rtype: List[EmittanceScan]
+    """
+    return load_emittance_scans(sorted(Path(directory).glob(pattern)), **kwargs)
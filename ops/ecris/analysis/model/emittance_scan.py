@@ -1,10 +1,26 @@
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
 
 import numpy as np
 
 from ops.ecris.operations.emittance_scan.parameters import LinearScanParameters
 
 
+def scan_position_range(scan_parameters: LinearScanParameters) -> np.ndarray:
+    return np.arange(
+        scan_parameters.position_min,
+        scan_parameters.position_max + scan_parameters.position_step,
+        scan_parameters.position_step,
+    )
+
+
+def scan_divergence_range(scan_parameters: LinearScanParameters) -> np.ndarray:
+    return np.arange(
+        scan_parameters.divergence_min,
+        scan_parameters.divergence_max + scan_parameters.divergence_step,
+        scan_parameters.divergence_step,
+    )
+
+
 class EmittanceScan:
     def __init__(
         self,
@@ -28,16 +44,35 @@ class EmittanceScan:
 
     @property
     def position_range(self) -> np.ndarray:
-        return np.arange(
-            self.scan_parameters.position_min,
-            self.scan_parameters.position_max + self.scan_parameters.position_step,
-            self.scan_parameters.position_step,
-        )
+        return scan_position_range(self.scan_parameters)
 
     @property
     def divergence_range(self) -> np.ndarray:
-        return np.arange(
-            self.scan_parameters.divergence_min,
-            self.scan_parameters.divergence_max + self.scan_parameters.divergence_step,
-            self.scan_parameters.divergence_step,
-        )
+        return scan_divergence_range(self.scan_parameters)
+
+
+class LazyEmittanceScan(EmittanceScan):
+    """Emittance scan whose data is only read when first accessed.
+
+    :param data_loader: callable returning the scan data array
+    """
+
+    def __init__(
+        self,
+        timestamp: str,
+        data_loader: Callable[[], np.ndarray],
+        scan_parameters: LinearScanParameters,
+        extra_metadata: Optional[Dict[str, Any]] = None,
+    ):
+        super().__init__(timestamp, None, scan_parameters, extra_metadata)  # type: ignore[arg-type]
+        self._data_loader = data_loader
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._data is not None
+
+    @property
+    def data(self) -> np.ndarray:
+        if self._data is None:
+            self._data = self._data_loader()
+        return self._data
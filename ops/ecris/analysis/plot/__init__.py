@@ -1 +1,20 @@
-from .plotting import plot_csd
+from typing import TYPE_CHECKING
+
+from ops.ecris.analysis._lazy import lazy_imports
+
+_LAZY_IMPORTS = {
+    "plot_csd": ".plotting",
+    "CSDViewer": ".csd_viewer",
+    "TrendJob": ".batch_render",
+    "render_csd_batch": ".batch_render",
+    "render_trend_batch": ".batch_render",
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+if TYPE_CHECKING:
+    from .batch_render import TrendJob, render_csd_batch, render_trend_batch
+    from .csd_viewer import CSDViewer
+    from .plotting import plot_csd
+
+__getattr__, __dir__ = lazy_imports(globals(), _LAZY_IMPORTS)
@@ -0,0 +1,290 @@
+"""Headless, parallel rendering of CSD and VENUS trend figures.
+
+Each worker process uses the Agg backend and keeps one figure per figure
+type, updating line data between renders instead of creating new figures.
+Clearing figures does not return memory to the operating system, so a
+worker above its memory limit is replaced instead.
+"""
+
+import json
+import logging
+import multiprocessing
+import resource
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from ops.ecris.analysis import VenusDataError
+from ops.ecris.analysis.csd.m_over_q import estimate_m_over_q
+from ops.ecris.analysis.io.datasheet_values import DATA_LABELS_BY_KEY
+from ops.ecris.analysis.io.read_csd_file import read_csd_from_file_pair
+from ops.ecris.analysis.model import CSD, Element
+from ops.ecris.analysis.plot.element_markers import plot_element_markers
+from ops.ecris.analysis.venus_data import get_venus_data
+
+_log = logging.getLogger(__name__)
+
+INDEX_FILE_NAME = "index.json"
+
+
+@dataclass(frozen=True)
+class TrendJob:
+    """A VENUS trend figure to render.
+
+    :param name: output file name, without extension
+    :param data_labels: VENUS data keys to plot
+    :param start: start of the time span
+    :param stop: end of the time span
+    """
+
+    name: str
+    data_labels: Tuple[str, ...]
+    start: datetime
+    stop: datetime
+
+
+def estimate_csd_m_over_q(csd: CSD) -> None:
+    csd.m_over_q = estimate_m_over_q(csd)
+
+
+def _resident_memory_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+
+class _FigureWorker:
+    def __init__(
+        self,
+        elements: Sequence[Element],
+        formats: Sequence[str],
+        dpi: int,
+        figsize: Tuple[float, float],
+        memory_limit_mb: Optional[float],
+    ) -> None:
+        self.elements = list(elements)
+        self.formats = list(formats)
+        self.dpi = dpi
+        self.figsize = figsize
+        self.memory_limit_mb = memory_limit_mb
+        self._figures: Dict[str, Figure] = {}
+
+    def _figure(self, kind: str) -> Figure:
+        if kind not in self._figures:
+            fig = Figure(figsize=self.figsize, tight_layout=True)
+            FigureCanvasAgg(fig)
+            fig.add_subplot()
+            self._figures[kind] = fig
+        return self._figures[kind]
+
+    def _save(self, fig: Figure, output_dir: Path, name: str) -> List[str]:
+        outputs = []
+        for fmt in self.formats:
+            output = output_dir / f"{name}.{fmt}"
+            fig.savefig(output, dpi=self.dpi)
+            outputs.append(output.name)
+        return outputs
+
+    def over_memory_limit(self) -> bool:
+        return self.memory_limit_mb is not None and _resident_memory_mb() >= self.memory_limit_mb
+
+    def render_csd(
+        self, csd_file: Path, output_dir: Path, scaling: Callable[[CSD], None]
+    ) -> Dict[str, Any]:
+        csd = read_csd_from_file_pair(csd_file)
+        scaling(csd)
+        fig = self._figure("csd")
+        ax = fig.axes[0]
+        if not ax.lines:
+            ax.plot([], [])
+            ax.set_xlabel("M/Q")
+            ax.set_ylabel(r"current [$\mu$A]")
+        for artist in [*ax.lines[1:], *ax.texts]:
+            artist.remove()
+        ax.lines[0].set_data(csd.m_over_q, csd.beam_current)
+        ax.relim()
+        ax.autoscale_view()
+        ax.set_title(csd.timestamp)
+        for i, element in enumerate(self.elements):
+            for artist in plot_element_markers(element, ax=ax, color=f"C{i + 1}"):
+                artist.set_animated(False)
+        outputs = self._save(fig, output_dir, csd_file.name)
+        return {"source": str(csd_file), "timestamp": csd.timestamp, "outputs": outputs}
+
+    def render_trend(self, job: TrendJob, output_dir: Path, venus_path: Path) -> Dict[str, Any]:
+        data = get_venus_data(venus_path, list(job.data_labels), job.start, job.stop)
+        fig = self._figure("trend")
+        ax = fig.axes[0]
+        for artist in list(ax.lines[len(job.data_labels):]):
+            artist.remove()
+        for i, key in enumerate(job.data_labels):
+            label = (
+                DATA_LABELS_BY_KEY[key].label_with_units() if key in DATA_LABELS_BY_KEY else key
+            )
+            if i < len(ax.lines):
+                ax.lines[i].set_data(data["time"], data[key])
+                ax.lines[i].set_label(label)
+            else:
+                ax.plot(data["time"], data[key], label=label)
+        ax.relim()
+        ax.autoscale_view()
+        ax.legend()
+        ax.set_title(f"{job.start} - {job.stop}")
+        outputs = self._save(fig, output_dir, job.name)
+        return {"source": job.name, "timestamp": str(job.start), "outputs": outputs}
+
+
+_WORKER: Optional[_FigureWorker] = None
+
+
+def _init_worker(*args) -> None:
+    import matplotlib
+
+    matplotlib.use("Agg")
+    global _WORKER
+    _WORKER = _FigureWorker(*args)
+
+
+def _render_task(method: str, source: Any, *args) -> Tuple[Dict[str, Any], bool]:
+    """Render one source, returning its index entry and whether the worker
+    is over its memory limit and should be replaced."""
+    assert _WORKER is not None
+    try:
+        entry = getattr(_WORKER, method)(source, *args)
+    except (Exception, VenusDataError) as e:
+        name = source.name if isinstance(source, TrendJob) else str(source)
+        _log.error(f"Rendering {name} failed: {e}")
+        entry = {"source": name, "timestamp": None, "outputs": [], "error": str(e)}
+    return entry, _WORKER.over_memory_limit()
+
+
+def _run_batch(
+    method: str,
+    sources: Iterable[Any],
+    task_args: Tuple[Any, ...],
+    output_dir: Path,
+    elements: Sequence[Element],
+    formats: Sequence[str],
+    dpi: int,
+    figsize: Tuple[float, float],
+    max_workers: Optional[int],
+    max_tasks_per_worker: Optional[int],
+    memory_limit_mb: Optional[float],
+) -> Path:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    sources = list(sources)
+    index: List[Optional[Dict[str, Any]]] = [None] * len(sources)
+    remaining = list(range(len(sources)))
+    while remaining:
+        # a worker over its memory limit can only be replaced by restarting the
+        # pool; renders that have not started are resubmitted to the new pool
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(list(elements), list(formats), dpi, figsize, memory_limit_mb),
+            max_tasks_per_child=max_tasks_per_worker,
+        ) as executor:
+            futures: Dict[int, Future] = {
+                i: executor.submit(_render_task, method, sources[i], *task_args)
+                for i in remaining
+            }
+            for i, future in futures.items():
+                if future.cancelled():
+                    continue
+                index[i], recycle = future.result()
+                if recycle:
+                    _log.info("Worker memory limit reached, restarting the worker pool")
+                    executor.shutdown(wait=True, cancel_futures=True)
+            remaining = [i for i, future in futures.items() if future.cancelled()]
+    index_path = output_dir / INDEX_FILE_NAME
+    with open(index_path, "w") as f:
+        json.dump(index, f, indent=2)
+    return index_path
+
+
+def render_csd_batch(
+    csd_files: Iterable[Path],
+    output_dir: Path,
+    *,
+    elements: Sequence[Element] = (),
+    scaling: Callable[[CSD], None] = estimate_csd_m_over_q,
+    formats: Sequence[str] = ("png",),
+    dpi: int = 100,
+    figsize: Tuple[float, float] = (9, 6),
+    max_workers: Optional[int] = None,
+    max_tasks_per_worker: Optional[int] = 200,
+    memory_limit_mb: Optional[float] = None,
+) -> Path:
+    """Render CSD figures with element markers in a process pool.
+
+    :param csd_files: CSD files, read with their datasheet files
+    :param output_dir: directory for the figures and the index
+    :param elements: elements to mark on every CSD
+    :param scaling: picklable function setting ``m_over_q`` on a loaded CSD
+    :param formats: output formats, e.g. ``("png", "svg")``
+    :param dpi: output resolution
+    :param figsize: figure size in inches
+    :param max_workers: number of worker processes
+    :param max_tasks_per_worker: renders before a worker process is replaced
+    :param memory_limit_mb: resident memory above which the workers are replaced
+    :return: path of the JSON index listing the outputs of every CSD
+    :rtype: Path
+    """
+    return _run_batch(
+        "render_csd",
+        [Path(f) for f in csd_files],
+        (output_dir, scaling),
+        output_dir,
+        elements,
+        formats,
+        dpi,
+        figsize,
+        max_workers,
+        max_tasks_per_worker,
+        memory_limit_mb,
+    )
+
+
+def render_trend_batch(
+    venus_path: Path,
+    jobs: Iterable[TrendJob],
+    output_dir: Path,
+    *,
+    formats: Sequence[str] = ("png",),
+    dpi: int = 100,
+    figsize: Tuple[float, float] = (12, 6),
+    max_workers: Optional[int] = None,
+    max_tasks_per_worker: Optional[int] = 200,
+    memory_limit_mb: Optional[float] = None,
+) -> Path:
+    """Render VENUS trend figures in a process pool.
+
+    See :func:`render_csd_batch` for the shared parameters.
+
+    :param venus_path: directory of converted VENUS parquet files
+    :param jobs: trend figures to render
+    :return: path of the JSON index listing the outputs of every job
+    :rtype: Path
+    """
+    return _run_batch(
+        "render_trend",
+        list(jobs),
+        (output_dir, venus_path),
+        output_dir,
+        (),
+        formats,
+        dpi,
+        figsize,
+        max_workers,
+        max_tasks_per_worker,
+        memory_limit_mb,
+    )
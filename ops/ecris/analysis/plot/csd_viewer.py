@@ -0,0 +1,145 @@
+"""Interactive CSD viewer that reuses one figure and blits element markers."""
+
+from typing import Iterable, List, Optional, Tuple
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.artist import Artist
+
+from ops.ecris.analysis.model import CSD, Element
+from ops.ecris.analysis.plot.element_markers import plot_element_markers
+
+
+def decimate_min_max(
+    x: np.ndarray, y: np.ndarray, x_min: float, x_max: float, n_columns: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Reduce a spectrum to the minimum and maximum point of each pixel column.
+
+    The points just outside the view are kept so the line reaches the edges,
+    and the returned points keep their original order.
+
+    :param x: x values of the spectrum
+    :param y: y values of the spectrum
+    :param x_min: lower limit of the view
+    :param x_max: upper limit of the view
+    :param n_columns: number of pixel columns in the view
+    :return: decimated x and y values
+    :rtype: Tuple[np.ndarray, np.ndarray]
+    """
+    in_view = (x >= x_min) & (x <= x_max)
+    near_view = in_view.copy()
+    near_view[1:] |= in_view[:-1]
+    near_view[:-1] |= in_view[1:]
+    idx = np.flatnonzero(near_view)
+    if len(idx) <= 2 * n_columns or x_max <= x_min:
+        return x[idx], y[idx]
+    columns = ((x[idx] - x_min) / (x_max - x_min) * n_columns).astype(int)
+    columns = columns.clip(0, n_columns - 1)
+    order = np.lexsort((y[idx], columns))
+    sorted_columns = columns[order]
+    starts = np.flatnonzero(np.r_[True, sorted_columns[1:] != sorted_columns[:-1]])
+    ends = np.r_[starts[1:], len(order)] - 1
+    keep = np.unique(np.concatenate([idx[order[starts]], idx[order[ends]]]))
+    return x[keep], y[keep]
+
+
+class CSDViewer:
+    """Step through CSDs in a single figure with fast element marker updates.
+
+    The spectrum is decimated to the current view on every pan or zoom, and
+    element markers are drawn as animated artists on top of a cached
+    background, so toggling elements only blits the markers.
+
+    :param elements: elements to mark initially
+    :param figsize: figure size in inches
+    """
+
+    def __init__(
+        self, elements: Iterable[Element] = (), figsize: Tuple[float, float] = (9, 6)
+    ) -> None:
+        self.fig = plt.figure(figsize=figsize, tight_layout=True)
+        self.ax = self.fig.gca()
+        (self._line,) = self.ax.plot([], [])
+        self.ax.set_xlabel("M/Q")
+        self.ax.set_ylabel(r"current [$\mu$A]")
+        self._elements: List[Element] = list(elements)
+        self._marker_artists: List[Artist] = []
+        self._background = None
+        self._csd: Optional[CSD] = None
+        self.fig.canvas.mpl_connect("draw_event", self._on_draw)
+        self.ax.callbacks.connect("xlim_changed", self._on_xlim_changed)
+
+    @property
+    def elements(self) -> List[Element]:
+        return list(self._elements)
+
+    def show_csd(self, csd: CSD) -> None:
+        """Replace the displayed spectrum, keeping the figure and markers.
+
+        :param csd: CSD to display, with M/Q set
+        """
+        if csd.m_over_q is None:
+            raise RuntimeError(
+                "CSD m_over_q is not set, estimate or scale the value before plotting"
+            )
+        self._csd = csd
+        self.ax.set_title(csd.timestamp)
+        self.ax.set_xlim(float(np.min(csd.m_over_q)), float(np.max(csd.m_over_q)))
+        y_min, y_max = float(np.min(csd.beam_current)), float(np.max(csd.beam_current))
+        margin = 0.05 * (y_max - y_min)
+        self.ax.set_ylim(y_min - margin, y_max + margin)
+        self._update_line()
+        self.fig.canvas.draw_idle()
+
+    def set_elements(self, elements: Iterable[Element]) -> None:
+        self._elements = list(elements)
+        self._update_markers()
+        self._blit()
+
+    def toggle_element(self, element: Element) -> None:
+        if element in self._elements:
+            self._elements.remove(element)
+        else:
+            self._elements.append(element)
+        self.set_elements(self._elements)
+
+    def _update_line(self) -> None:
+        if self._csd is None:
+            return
+        x_min, x_max = self.ax.get_xlim()
+        n_columns = max(int(self.ax.bbox.width), 1)
+        x, y = decimate_min_max(
+            self._csd.m_over_q, self._csd.beam_current, x_min, x_max, n_columns
+        )
+        self._line.set_data(x, y)
+
+    def _update_markers(self) -> None:
+        for artist in self._marker_artists:
+            artist.remove()
+        self._marker_artists = []
+        for i, element in enumerate(self._elements):
+            self._marker_artists.extend(
+                plot_element_markers(element, ax=self.ax, color=f"C{i + 1}")
+            )
+
+    def _on_xlim_changed(self, ax) -> None:
+        self._update_line()
+
+    def _on_draw(self, event) -> None:
+        self._background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self._update_markers()
+        self._draw_markers()
+
+    def _draw_markers(self) -> None:
+        for artist in self._marker_artists:
+            self.fig.draw_artist(artist)
+
+    def _blit(self) -> None:
+        canvas = self.fig.canvas
+        if self._background is None:
+            canvas.draw_idle()
+            return
+        canvas.restore_region(self._background)
+        self._draw_markers()
+        canvas.blit(self.fig.bbox)
+        canvas.flush_events()
@@ -1,7 +1,10 @@
 from collections import deque
 from itertools import compress
+from typing import List, Optional
 
 import matplotlib.pyplot as plt
+from matplotlib.artist import Artist
+from matplotlib.axes import Axes
 from matplotlib.markers import MarkerStyle
 
 from ops.ecris.analysis.model import Element
@@ -14,10 +17,12 @@ def plot_element_markers(
     fraction_y: float = 0.5,
     x_space_required: int = 35,
     draw_lines: bool = False,
+    ax: Optional[Axes] = None,
     **kwargs,
-):
-    ax = plt.gca()
-    labels = []
+) -> List[Artist]:
+    if ax is None:
+        ax = plt.gca()
+    labels: List[Artist] = []
     q_values = range(1, element.atomic_number + 1)
     m_over_q = [element.atomic_mass / q for q in q_values]
     mask = [mq < 10 for mq in m_over_q]
@@ -66,6 +71,7 @@ def plot_element_markers(
                 weight="bold",
                 clip_on=True,
             )
+            labels.append(txt)
 
     element_artist = ax.text(
         1.01,
@@ -76,3 +82,4 @@ def plot_element_markers(
         animated=True,
         color=ln.get_color(),
     )
+    return [ln, *labels, element_artist]
@@ -0,0 +1,285 @@
+"""This module contains a nearest-neighbor index over ion source settings,
+used to find the past time windows whose settings are closest to a given
+set of settings."""
+
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from logging import getLogger
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import polars as pl
+from sklearn.neighbors import KDTree
+
+from ops.ecris.analysis import VenusDataError
+from ops.ecris.analysis.instrumentation import span
+
+_log = getLogger(__name__)
+
+DEFAULT_SETTINGS_KEYS = [
+    "inj_i", "mid_i", "ext_i", "sext_i",
+    "extraction_v", "bias_v",
+    "g28_fw", "k18_fw", "k18_2_fw",
+    "lt_oven_1_sp", "lt_oven_2_sp", "ht_oven_i", "ind_oven_watts",
+]
+
+
+@dataclass
+class SettingsMatch:
+    start: datetime
+    stop: datetime
+    distance: float
+    settings: Dict[str, float]
+
+
+class SettingsIndex:
+    """KD-tree over settings averaged in fixed time windows.
+
+    Settings are normalized by their mean and standard deviation over the
+    indexed windows, so every key weighs the same in the distance. A key
+    without data in a window, e.g. a filler column of a file recorded before
+    the channel existed, is imputed with its mean over the indexed windows.
+    Such a window is then as far from a query in that key as a window with
+    average settings would be.
+
+    :param keys: ``DATA_LABELS`` keys spanning the settings space
+    :param window: length of the time windows settings are averaged over
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[str] = DEFAULT_SETTINGS_KEYS,
+        window: timedelta = timedelta(minutes=5),
+    ) -> None:
+        self.keys = list(keys)
+        self.window = window
+        self.indexed_files: set[str] = set()
+        self._starts = np.empty(0)
+        self._values = np.empty((0, len(self.keys)))
+        self._offset = np.zeros(len(self.keys))
+        self._scale = np.ones(len(self.keys))
+        self._tree: Optional[KDTree] = None
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    @classmethod
+    def from_venus_path(
+        cls, path: Path, index_path: Optional[Path] = None, **kwargs
+    ) -> "SettingsIndex":
+        """Index converted VENUS files, reusing and updating a saved index.
+
+        :param path: directory of converted VENUS parquet files
+        :param index_path: file the index is loaded from, if it exists, and saved to
+        :return: the index
+        :rtype: SettingsIndex
+        """
+        if index_path is not None and index_path.exists():
+            index = cls.load(index_path)
+            if list(kwargs.get("keys", index.keys)) != index.keys or (
+                kwargs.get("window", index.window) != index.window
+            ):
+                raise RuntimeError(f"Settings index {index_path} has different keys or window")
+        else:
+            index = cls(**kwargs)
+        added = index.update(path)
+        if index_path is not None and (added or not index_path.exists()):
+            index.save(index_path)
+        return index
+
+    def save(self, index_path: Path) -> None:
+        """Write the indexed windows and files, so a later process can update the index."""
+        metadata = {
+            "keys": self.keys,
+            "window": self.window.total_seconds(),
+            "indexed_files": sorted(self.indexed_files),
+        }
+        temporary_path = index_path.with_suffix(".tmp.npz")
+        np.savez(
+            temporary_path,
+            starts=self._starts,
+            values=self._values,
+            metadata=np.array(json.dumps(metadata)),
+        )
+        os.replace(temporary_path, index_path)
+
+    @classmethod
+    def load(cls, index_path: Path) -> "SettingsIndex":
+        """Read an index written by :meth:`save`."""
+        with np.load(index_path) as saved:
+            metadata = json.loads(str(saved["metadata"]))
+            index = cls(metadata["keys"], timedelta(seconds=metadata["window"]))
+            index.indexed_files = set(metadata["indexed_files"])
+            if len(saved["starts"]):
+                index._add(saved["starts"], saved["values"])
+        return index
+
+    def update(self, path: Path) -> int:
+        """Index the converted VENUS files in ``path`` that are not indexed yet.
+
+        :param path: directory of converted VENUS parquet files
+        :return: number of windows added
+        :rtype: int
+        """
+        new_files = [f for f in sorted(path.glob("*.parquet")) if f.name not in self.indexed_files]
+        return self.add_venus_files(new_files)
+
+    def add_venus_files(self, files: Iterable[Path]) -> int:
+        """Average the settings of converted VENUS files in time windows and index them.
+
+        Files that cannot be read are logged and skipped, and are not marked
+        as indexed.
+
+        :param files: converted VENUS parquet files
+        :return: number of windows added
+        :rtype: int
+        """
+        frames = []
+        read_files = []
+        for file in files:
+            try:
+                frames.append(self._read_windows(file))
+            except (VenusDataError, OSError, pl.exceptions.PolarsError) as e:
+                # skipped files are not marked as indexed, so update() retries them
+                _log.error(f"Failed to index settings of {file}: {e}")
+                continue
+            read_files.append(file.name)
+        added = 0
+        if frames:
+            windows = pl.concat(frames).group_by("start").agg(pl.col(self.keys).mean())
+            values = windows.select(pl.col(self.keys).cast(pl.Float64)).to_numpy()
+            added = self._add(windows["start"].to_numpy(), values)
+        self.indexed_files.update(read_files)
+        return added
+
+    def _read_windows(self, file: Path) -> pl.DataFrame:
+        window_s = self.window.total_seconds()
+        with span("index.read_settings", file=str(file)) as s:
+            scan = pl.scan_parquet(file)
+            columns = scan.collect_schema().names()
+            if "time" not in columns:
+                raise VenusDataError(f"Data column time not present in {file}.")
+            frame = (
+                scan.select(
+                    (pl.col("time") // window_s * window_s).alias("start"),
+                    *[
+                        pl.col(k).cast(pl.Float64).fill_nan(None) if k in columns
+                        else pl.lit(None, dtype=pl.Float64).alias(k)
+                        for k in self.keys
+                    ],
+                )
+                .group_by("start")
+                .agg(pl.col(self.keys).mean())
+                .collect()
+            )
+            missing = [k for k in self.keys if frame[k].null_count() == frame.height]
+            if missing and frame.height:
+                _log.warning(f"Settings {missing} have no data in {file}, "
+                             "their mean is used in its windows")
+            frame = frame.filter(~pl.all_horizontal(pl.col(self.keys).is_null()))
+            s.count("windows", frame.height)
+        return frame
+
+    def add_records(
+        self, times: Sequence[datetime], settings: Sequence[Dict[str, float]]
+    ) -> int:
+        """Index individual settings records, e.g. the datasheets of CSDs.
+
+        Records missing any of the index keys are skipped.
+
+        :param times: time of each record, the start of its window
+        :param settings: settings of each record keyed by ``DATA_LABELS`` key
+        :return: number of records added
+        :rtype: int
+        """
+        starts, values = [], []
+        for time, record in zip(times, settings):
+            if all(k in record for k in self.keys):
+                starts.append(time.timestamp())
+                values.append([record[k] for k in self.keys])
+        if not starts:
+            return 0
+        return self._add(np.array(starts), np.array(values, dtype=float))
+
+    def _add(self, starts: np.ndarray, values: np.ndarray) -> int:
+        self._starts = np.concatenate([self._starts, starts])
+        self._values = np.concatenate([self._values, values])
+        order = np.argsort(self._starts, kind="stable")
+        self._starts = self._starts[order]
+        self._values = self._values[order]
+        known = ~np.isnan(self._values)
+        counts = known.sum(axis=0)
+        offset = np.where(known, self._values, 0.0).sum(axis=0) / np.maximum(counts, 1)
+        variance = np.where(known, (self._values - offset) ** 2, 0.0).sum(axis=0)
+        scale = np.sqrt(variance / np.maximum(counts, 1))
+        self._offset = offset
+        self._scale = np.where(scale > 0, scale, 1.0)
+        with span("index.build_tree") as s:
+            # missing settings are imputed with their mean, i.e. zero after normalizing
+            normalized = np.nan_to_num((self._values - self._offset) / self._scale, nan=0.0)
+            self._tree = KDTree(normalized)
+            s.count("windows", len(self._starts))
+        _log.debug(f"Added {len(starts)} windows, {len(self._starts)} indexed")
+        return len(starts)
+
+    def _normalized_query(self, settings: Dict[str, float]) -> np.ndarray:
+        if self._tree is None:
+            raise RuntimeError("Settings index is empty")
+        missing = [k for k in self.keys if k not in settings]
+        if missing:
+            raise KeyError(f"Query is missing settings {missing}")
+        values = np.array([settings[k] for k in self.keys], dtype=float)
+        return ((values - self._offset) / self._scale)[np.newaxis, :]
+
+    def _match(self, i: int, distance: float) -> SettingsMatch:
+        start = datetime.fromtimestamp(self._starts[i])
+        return SettingsMatch(
+            start=start,
+            stop=start + self.window,
+            distance=float(distance),
+            settings=dict(zip(self.keys, self._values[i].tolist())),
+        )
+
+    def query(self, settings: Dict[str, float], k: int = 5) -> List[SettingsMatch]:
+        """Find the ``k`` time windows with the closest settings.
+
+        :param settings: settings to look for, keyed by ``DATA_LABELS`` key
+        :param k: number of windows to return
+        :return: matching windows, closest first
+        :rtype: List[SettingsMatch]
+        """
+        query = self._normalized_query(settings)
+        distances, indices = self._tree.query(query, k=min(k, len(self)))
+        return [self._match(i, d) for i, d in zip(indices[0], distances[0])]
+
+    def query_radius(self, settings: Dict[str, float], radius: float) -> List[SettingsMatch]:
+        """Find every time span whose settings are within a normalized distance.
+
+        Consecutive matching windows are merged into one span, reported with
+        its closest window.
+
+        :param settings: settings to look for, keyed by ``DATA_LABELS`` key
+        :param radius: distance in units of the per-key standard deviation
+        :return: matching time spans, in time order
+        :rtype: List[SettingsMatch]
+        """
+        query = self._normalized_query(settings)
+        indices, distances = self._tree.query_radius(query, r=radius, return_distance=True)
+        order = np.argsort(indices[0])
+        window_s = self.window.total_seconds()
+        matches: List[SettingsMatch] = []
+        last_stop = -np.inf
+        for i, distance in zip(indices[0][order], distances[0][order]):
+            if self._starts[i] <= last_stop and matches:
+                merged = matches[-1]
+                if distance < merged.distance:
+                    closest = self._match(i, distance)
+                    merged.distance, merged.settings = closest.distance, closest.settings
+                merged.stop = max(merged.stop, datetime.fromtimestamp(self._starts[i] + window_s))
+            else:
+                matches.append(self._match(i, distance))
+            last_stop = max(last_stop, self._starts[i] + window_s)
+        return matches
@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 from typing import List, Optional
 
 from ops.ecris.analysis import VenusDataError
+from ops.ecris.analysis.instrumentation import span
 from ops.ecris.analysis.io.datasheet_values import GAS_NAMES
 
 _FILE_DATE_FORMAT = '%Y_%m_%d_%H_%M_%S'
@@ -32,7 +33,13 @@ def get_all_venus_data(path: Path, start: datetime, stop: datetime) -> pd.DataFr
     files_to_load = files_in_timeframe(path.glob('*.parquet'), start, stop)
     if not files_to_load:
         raise VenusDataError('No data files found for provided time span.')
-    return pd.concat([pd.read_parquet(f) for f in files_to_load])
+    return pd.concat([_read_parquet(f) for f in files_to_load])
+
+def _read_parquet(file: Path) -> pd.DataFrame:
+    with span("io.read_parquet", file=str(file)) as s:
+        df = pd.read_parquet(file)
+        s.count("rows", len(df))
+    return df
 
 def get_venus_data(path: Path, data_label: str | List[str], start: datetime, stop: datetime) -> pd.DataFrame:
     if isinstance(data_label, str):
@@ -0,0 +1,239 @@
+"""This module detects events such as sparks and trips in converted VENUS
+data. Files are processed one at a time with polars, carrying the rows a
+rule needs and any open event across file boundaries, so memory use does
+not grow with the length of the time span."""
+
+from dataclasses import dataclass
+from datetime import datetime
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Literal, Optional, Sequence
+
+import polars as pl
+
+from ops.ecris.analysis.instrumentation import span
+from ops.ecris.analysis.venus_data import files_in_timeframe
+
+_log = getLogger(__name__)
+
+Direction = Literal["both", "rising", "falling"]
+
+
+def _directional(change: pl.Expr, limit: float, direction: Direction) -> pl.Expr:
+    # NaN compares greater than any number in polars, so undefined changes such
+    # as 0/0 on a flat channel are turned into nulls, which are never flagged
+    change = change.fill_nan(None)
+    if direction == "rising":
+        return change > limit
+    if direction == "falling":
+        return change < -limit
+    return change.abs() > limit
+
+
+@dataclass(frozen=True)
+class ThresholdRule:
+    """Flag samples outside ``[minimum, maximum]``."""
+
+    name: str
+    column: str
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+
+    @property
+    def history(self) -> int:
+        return 0
+
+    def flag(self) -> pl.Expr:
+        value = pl.col(self.column)
+        flag = pl.lit(False)
+        if self.minimum is not None:
+            flag = flag | (value < self.minimum)
+        if self.maximum is not None:
+            flag = flag | (value > self.maximum)
+        return flag
+
+
+@dataclass(frozen=True)
+class DerivativeRule:
+    """Flag samples changing faster than ``max_rate`` per second."""
+
+    name: str
+    column: str
+    max_rate: float
+    direction: Direction = "both"
+
+    @property
+    def history(self) -> int:
+        return 1
+
+    def flag(self) -> pl.Expr:
+        dt = pl.col("time").diff()
+        rate = pl.when(dt > 0).then(pl.col(self.column).diff() / dt)
+        return _directional(rate, self.max_rate, self.direction).fill_null(False)
+
+
+@dataclass(frozen=True)
+class ZScoreRule:
+    """Flag samples more than ``threshold`` standard deviations from the
+    mean of the preceding ``window`` samples."""
+
+    name: str
+    column: str
+    window: int
+    threshold: float
+    direction: Direction = "both"
+
+    @property
+    def history(self) -> int:
+        return self.window
+
+    def flag(self) -> pl.Expr:
+        value = pl.col(self.column)
+        mean = value.rolling_mean(self.window).shift(1)
+        std = value.rolling_std(self.window).shift(1)
+        z_score = pl.when(std > 0).then((value - mean) / std)
+        return _directional(z_score, self.threshold, self.direction).fill_null(False)
+
+
+Rule = ThresholdRule | DerivativeRule | ZScoreRule
+
+EVENT_SCHEMA = {
+    "rule": pl.String,
+    "column": pl.String,
+    "start": pl.Datetime("us"),
+    "stop": pl.Datetime("us"),
+    "n_samples": pl.Int64,
+    "min_value": pl.Float64,
+    "max_value": pl.Float64,
+}
+
+
+def _read_columns(file: Path, columns: List[str]) -> pl.DataFrame:
+    scan = pl.scan_parquet(file)
+    available = scan.collect_schema().names()
+    return (
+        scan.select(
+            pl.col("time").cast(pl.Float64),
+            *[
+                pl.col(c).cast(pl.Float64).fill_nan(None) if c in available
+                else pl.lit(None, dtype=pl.Float64).alias(c)
+                for c in columns
+            ],
+        )
+        .sort("time")
+        .collect()
+    )
+
+
+def _group_samples(samples: pl.DataFrame, rule: Rule, max_gap: float) -> List[Dict[str, Any]]:
+    return (
+        samples.select("time", pl.col(rule.column).alias("value"))
+        .with_columns(
+            (pl.col("time").diff() > max_gap).fill_null(True).cum_sum().alias("_event")
+        )
+        .group_by("_event", maintain_order=True)
+        .agg(
+            pl.lit(rule.name).alias("rule"),
+            pl.lit(rule.column).alias("column"),
+            pl.col("time").min().alias("start"),
+            pl.col("time").max().alias("stop"),
+            pl.len().cast(pl.Int64).alias("n_samples"),
+            pl.col("value").min().alias("min_value"),
+            pl.col("value").max().alias("max_value"),
+        )
+        .drop("_event")
+        .to_dicts()
+    )
+
+
+def detect_events(
+    files: Iterable[Path],
+    rules: Sequence[Rule],
+    *,
+    max_gap: float = 60.0,
+    start: Optional[datetime] = None,
+    stop: Optional[datetime] = None,
+) -> pl.DataFrame:
+    """Run event rules over converted VENUS files in time order.
+
+    Flagged samples of a rule that are at most ``max_gap`` seconds apart are
+    merged into one event.
+
+    :param files: converted VENUS parquet files, in time order
+    :param rules: rules to evaluate
+    :param max_gap: longest gap in seconds between samples of one event
+    :param start: ignore samples before this time
+    :param stop: ignore samples after this time
+    :return: one row per event with its rule, column, start, stop, number of
+        flagged samples and the range of the flagged values
+    :rtype: pl.DataFrame
+    """
+    columns = sorted({rule.column for rule in rules})
+    history = max((rule.history for rule in rules), default=0)
+    flag_names = [f"_flag_{i}" for i in range(len(rules))]
+    time_filter = pl.lit(True)
+    if start is not None:
+        time_filter = time_filter & (pl.col("time") >= start.timestamp())
+    if stop is not None:
+        time_filter = time_filter & (pl.col("time") <= stop.timestamp())
+
+    carry = pl.DataFrame(schema={"time": pl.Float64, **{c: pl.Float64 for c in columns}})
+    open_events: Dict[int, Dict[str, Any]] = {}
+    events: List[Dict[str, Any]] = []
+    for file in files:
+        with span("events.scan_file", file=str(file)) as s:
+            data = pl.concat([carry, _read_columns(file, columns)])
+            flagged = (
+                data.lazy()
+                .with_row_index("_row")
+                .with_columns([rule.flag().alias(n) for rule, n in zip(rules, flag_names)])
+                .filter((pl.col("_row") >= carry.height) & time_filter)
+                .filter(pl.any_horizontal(flag_names))
+                .collect()
+            )
+            s.count("rows", data.height - carry.height)
+            s.count("flagged", flagged.height)
+            carry = data.tail(history) if history else carry
+        for i, (rule, flag_name) in enumerate(zip(rules, flag_names)):
+            file_events = _group_samples(flagged.filter(pl.col(flag_name)), rule, max_gap)
+            if not file_events:
+                continue
+            event = open_events.pop(i, None)
+            if event is not None:
+                first = file_events[0]
+                if first["start"] - event["stop"] <= max_gap:
+                    file_events[0] = {
+                        **event,
+                        "stop": first["stop"],
+                        "n_samples": event["n_samples"] + first["n_samples"],
+                        "min_value": min(event["min_value"], first["min_value"]),
+                        "max_value": max(event["max_value"], first["max_value"]),
+                    }
+                else:
+                    events.append(event)
+            events.extend(file_events[:-1])
+            open_events[i] = file_events[-1]
+    events.extend(open_events.values())
+    for event in events:
+        event["start"] = datetime.fromtimestamp(event["start"])
+        event["stop"] = datetime.fromtimestamp(event["stop"])
+    _log.debug(f"Found {len(events)} events")
+    return pl.DataFrame(events, schema=EVENT_SCHEMA).sort("start")
+
+
+def detect_venus_events(
+    path: Path, rules: Sequence[Rule], start: datetime, stop: datetime, **kwargs
+) -> pl.DataFrame:
+    """Run event rules over the converted VENUS files covering a time span.
+
+    See :func:`detect_events`.
+
+    :param path: directory of converted VENUS parquet files
+    :param rules: rules to evaluate
+    :param start: start of the time span
+    :param stop: end of the time span
+    :return: events table
+    :rtype: pl.DataFrame
+    """
+    files = files_in_timeframe(path.glob("*.parquet"), start, stop)
+    return detect_events(files, rules, start=start, stop=stop, **kwargs)
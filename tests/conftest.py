@@ -0,0 +1,4 @@
+from benchmarks.stand_ins import install_operations_stand_ins
+
+# the emittance scan tests run without the ops.ecris operations package
+install_operations_stand_ins()
@@ -0,0 +1,65 @@
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+from benchmarks.synthetic import OXYGEN, write_synthetic_csd
+from ops.ecris.analysis.plot.batch_render import (
+    INDEX_FILE_NAME,
+    TrendJob,
+    render_csd_batch,
+    render_trend_batch,
+)
+
+
+def _csd_files(tmp_path, n=3):
+    return [
+        write_synthetic_csd(tmp_path, timestamp=1754000000 + 60 * i, elements=(OXYGEN,))
+        for i in range(n)
+    ]
+
+
+def test_render_csd_batch(tmp_path):
+    files = _csd_files(tmp_path)
+    index_path = render_csd_batch(files, tmp_path / "out", elements=[OXYGEN], max_workers=1)
+    assert index_path == tmp_path / "out" / INDEX_FILE_NAME
+    index = json.loads(index_path.read_text())
+    assert [entry["source"] for entry in index] == [str(f) for f in files]
+    for entry in index:
+        assert "error" not in entry
+        assert entry["outputs"] == [f"{Path(entry['source']).name}.png"]
+        assert (tmp_path / "out" / entry["outputs"][0]).stat().st_size > 0
+
+
+def test_render_csd_batch_replaces_workers_over_memory_limit(tmp_path):
+    files = _csd_files(tmp_path)
+    index_path = render_csd_batch(
+        files, tmp_path / "out", max_workers=1, memory_limit_mb=0, formats=("png", "svg")
+    )
+    index = json.loads(index_path.read_text())
+    assert [entry["source"] for entry in index] == [str(f) for f in files]
+    assert all(len(entry["outputs"]) == 2 for entry in index)
+    assert len(list((tmp_path / "out").glob("*.svg"))) == len(files)
+
+
+def test_render_trend_batch_records_failed_jobs(tmp_path):
+    venus_path = tmp_path / "venus"
+    venus_path.mkdir()
+    start = datetime(2025, 8, 1)
+    time = start.timestamp() + np.arange(0, 86400, 60.0)
+    pl.DataFrame({"time": time, "inj_i": 100 + np.sin(time / 3600)}).write_parquet(
+        venus_path / "venus_data_2025_08_01_00_00_00.parquet"
+    )
+    jobs = [
+        TrendJob("inj_i", ("inj_i",), start, start + timedelta(hours=6)),
+        TrendJob("missing_column", ("no_such",), start, start + timedelta(hours=6)),
+        TrendJob("no_files", ("inj_i",), datetime(2026, 1, 1), datetime(2026, 1, 2)),
+    ]
+    index_path = render_trend_batch(venus_path, jobs, tmp_path / "out", max_workers=1)
+    index = json.loads(index_path.read_text())
+    assert [entry["source"] for entry in index] == [job.name for job in jobs]
+    assert index[0]["outputs"] == ["inj_i.png"]
+    assert (tmp_path / "out" / "inj_i.png").exists()
+    assert all("error" in entry and not entry["outputs"] for entry in index[1:])
@@ -0,0 +1,120 @@
+import numpy as np
+
+from ops.ecris.analysis import instrumentation
+from ops.ecris.analysis.csd.cache import (
+    ResultCache,
+    cached_polynomial_fit_mq,
+    content_hash,
+    memoize,
+)
+from ops.ecris.analysis.model import CSD, Element
+
+
+def _csd(scale=1.0):
+    data = np.arange(40, dtype=float).reshape(10, 4) * scale
+    return CSD(data=data, timestamp="2025-01-01 00:00:00", settings={"extraction_v": 20.0})
+
+
+def test_content_hash_depends_on_content():
+    oxygen = Element("Oxygen", "O", 16, 8)
+    assert content_hash(_csd(), oxygen) == content_hash(_csd(), Element("Oxygen", "O", 16, 8))
+    assert content_hash(_csd(), oxygen) != content_hash(_csd(2.0), oxygen)
+    assert content_hash(_csd(), oxygen) != content_hash(_csd(), oxygen, order=2)
+
+
+def test_memoize_uses_memory_and_disk(tmp_path):
+    calls = []
+
+    def total_current(csd, factor=1.0):
+        calls.append(1)
+        return csd.beam_current.sum() * factor
+
+    cached = memoize(ResultCache(tmp_path))(total_current)
+    assert cached(_csd()) == cached(_csd())
+    cached(_csd(), factor=2.0)
+    assert len(calls) == 2
+
+    # a new cache on the same directory, e.g. in another worker, reuses results
+    shared = memoize(ResultCache(tmp_path))(total_current)
+    shared(_csd())
+    assert len(calls) == 2
+
+
+def test_disk_store_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(tmp_path, max_memory_items=1, max_disk_bytes=30_000)
+    for i in range(5):
+        cache.put(f"{i:064d}", np.zeros(1000) + i)
+    size = sum(p.stat().st_size for p in tmp_path.glob("*/*.pkl"))
+    assert size <= 30_000
+    found, value = cache.get(f"{4:064d}")
+    assert found and value[0] == 4
+    assert not cache.get(f"{0:064d}")[0]
+
+
+def test_memoize_misses_after_constant_change(tmp_path):
+    cache = ResultCache(tmp_path)
+
+    def to_seconds(x):
+        return x * 1e-3
+
+    first = memoize(cache)(to_seconds)(np.ones(3))
+
+    def to_seconds(x):  # noqa: F811
+        return x * 1e-6
+
+    second = memoize(cache)(to_seconds)(np.ones(3))
+    assert first[0] == 1e-3 and second[0] == 1e-6
+
+
+def test_cached_polynomial_fit(tmp_path):
+    from benchmarks.synthetic import OXYGEN, write_synthetic_csd
+    from ops.ecris.analysis.csd.polynomial_fit import polynomial_fit_mq
+    from ops.ecris.analysis.io import read_csd_from_file_pair
+
+    csd = read_csd_from_file_pair(write_synthetic_csd(tmp_path / "csd", elements=(OXYGEN,)))
+    cache = ResultCache(tmp_path / "cache")
+    kwargs = {"max_function_evaluations": 200}
+    m_over_q, _ = cached_polynomial_fit_mq(csd, [OXYGEN], cache, **kwargs)
+    assert np.array_equal(m_over_q, polynomial_fit_mq(csd, [OXYGEN], **kwargs)[0])
+    assert len(list((tmp_path / "cache").glob("*/*.pkl"))) == 1
+    cached, _ = cached_polynomial_fit_mq(csd, [OXYGEN], ResultCache(tmp_path / "cache"), **kwargs)
+    assert np.array_equal(cached, m_over_q)
+    cached_polynomial_fit_mq(csd, [OXYGEN], cache, max_function_evaluations=300)
+    assert len(list((tmp_path / "cache").glob("*/*.pkl"))) == 2
+
+
+def test_cache_is_shared_with_spawned_workers(tmp_path):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+
+    from benchmarks.synthetic import OXYGEN, write_synthetic_csd
+    from ops.ecris.analysis.io import read_csd_from_file_pair
+
+    csds = [
+        read_csd_from_file_pair(
+            write_synthetic_csd(tmp_path, timestamp=1754000000 + 60 * i, elements=(OXYGEN,))
+        )
+        for i in range(2)
+    ]
+    cache = ResultCache(tmp_path / "cache")
+    fit = partial(
+        cached_polynomial_fit_mq, elements=[OXYGEN], cache=cache, max_function_evaluations=100
+    )
+    with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("spawn")) as executor:
+        results = list(executor.map(fit, csds))
+    assert len(list((tmp_path / "cache").glob("*/*.pkl"))) == 2
+    # the parent process finds the results the workers stored
+    shared = ResultCache(tmp_path / "cache")
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        for csd, (m_over_q, _) in zip(csds, results):
+            cached, _ = cached_polynomial_fit_mq(
+                csd, [OXYGEN], shared, max_function_evaluations=100
+            )
+            assert np.array_equal(cached, m_over_q)
+        assert instrumentation.summary()["counters"]["cache.disk_hits"] == 2
+    finally:
+        instrumentation.disable()
+        instrumentation.reset()
@@ -0,0 +1,61 @@
+import numpy as np
+import polars as pl
+import pyarrow.parquet as pq
+import pytest
+
+from ops.ecris.analysis.io.convert_venus_data import (
+    EncodingProfile,
+    compare_encoding_profiles,
+    write_venus_parquet,
+)
+
+
+def _venus_frame(rows=500):
+    return pl.DataFrame({
+        "unix_epoch_milliseconds": np.arange(rows, dtype=np.int64) * 1000,
+        "time": 1.754e9 + np.arange(rows, dtype=float),
+        "inj_i": 1000.0 + np.sin(np.arange(rows) / 10),
+        "filler": np.full(rows, np.nan),
+    })
+
+
+def test_write_compact_profile(tmp_path):
+    df = _venus_frame()
+    write_venus_parquet(df, tmp_path / "compact.parquet", "compact")
+    read = pl.read_parquet(tmp_path / "compact.parquet")
+    assert read.schema["time"] == pl.Float64
+    assert read.schema["inj_i"] == pl.Float32
+    assert read["filler"].null_count() == len(df)
+    assert np.array_equal(read["time"].to_numpy(), df["time"].to_numpy())
+    encodings = pq.ParquetFile(tmp_path / "compact.parquet").metadata.row_group(0)
+    inj_i = next(
+        encodings.column(i) for i in range(encodings.num_columns)
+        if encodings.column(i).path_in_schema == "inj_i"
+    )
+    assert "BYTE_STREAM_SPLIT" in inj_i.encodings
+
+
+def test_write_default_profile_unchanged(tmp_path):
+    df = _venus_frame()
+    write_venus_parquet(df, tmp_path / "default.parquet")
+    read = pl.read_parquet(tmp_path / "default.parquet")
+    assert read.schema == df.schema
+    assert read["filler"].is_nan().all()
+
+
+def test_unknown_profile(tmp_path):
+    with pytest.raises(RuntimeError):
+        write_venus_parquet(_venus_frame(), tmp_path / "x.parquet", "smallest")
+
+
+def test_compare_encoding_profiles(tmp_path):
+    _venus_frame().write_parquet(tmp_path / "venus_data.parquet")
+    result = compare_encoding_profiles(
+        [tmp_path / "venus_data.parquet"],
+        {"default": EncodingProfile(), "fast_read": EncodingProfile(compression="lz4")},
+        columns=["time", "inj_i"],
+        repeats=1,
+    )
+    assert result["profile"].to_list() == ["default", "fast_read"]
+    assert result["size_ratio"][0] == pytest.approx(1.0)
+    assert (result["max_relative_error"] == 0.0).all()
@@ -0,0 +1,37 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np  # noqa: E402
+
+from ops.ecris.analysis.model import CSD, Element  # noqa: E402
+from ops.ecris.analysis.plot.csd_viewer import CSDViewer, decimate_min_max  # noqa: E402
+
+
+def test_decimate_min_max_keeps_extremes():
+    x = np.linspace(0, 10, 100_001)
+    y = np.sin(x * 50)
+    y[50_000] = 5
+    dx, dy = decimate_min_max(x, y, 2, 8, 100)
+    assert len(dx) <= 2 * 100 + 2
+    assert np.all(np.diff(dx) > 0)
+    assert dy.max() == 5
+    assert dx.min() < 2 and dx.max() > 8
+
+
+def test_viewer_reuses_figure_and_toggles_elements():
+    m_over_q = np.linspace(1, 9, 5000)
+    data = np.zeros((5000, 4))
+    data[:, 3] = np.exp(-((m_over_q - 2) ** 2) / 0.01) * 1e-6
+    csd = CSD(data=data, timestamp="2025-01-01 00:00:00", settings={})
+    csd.m_over_q = m_over_q
+    viewer = CSDViewer([Element("Oxygen", "O", 16, 8)])
+    viewer.show_csd(csd)
+    viewer.fig.canvas.draw()
+    n_artists = len(viewer._marker_artists)
+    assert n_artists > 0
+    viewer.toggle_element(Element("Carbon", "C", 12, 6))
+    assert len(viewer._marker_artists) > n_artists
+    viewer.show_csd(csd)
+    viewer.fig.canvas.draw()
+    assert len(viewer.ax.lines) == 1 + len(viewer.elements)
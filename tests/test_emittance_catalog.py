@@ -0,0 +1,98 @@
+import datetime as dt
+import os
+
+import h5py
+import numpy as np
+import pandas as pd
+
+from ops.ecris.analysis.emittance_scan.catalog import (
+    join_venus_data,
+    read_emittance_catalog,
+    update_emittance_catalog,
+)
+
+T0 = 1774303600
+
+
+def _write_scan(path, width=2.0):
+    x = np.arange(-10.0, 11.0, 1.0)[:, None]
+    xp = np.arange(-30.0, 32.0, 2.0)[None, :]
+    data = np.exp(-x**2 / (2 * width**2) - xp**2 / 90 + 0.02 * x * xp)
+    with h5py.File(path, "w") as f:
+        dataset = f.create_dataset("scan_data", data=data)
+        dataset.attrs.update({
+            "axis": "X",
+            "position_min": -10.0,
+            "position_max": 10.0,
+            "position_step": 1.0,
+            "divergence_min": -30.0,
+            "divergence_max": 30.0,
+            "divergence_step": 2.0,
+        })
+    return path
+
+
+def _files(tmp_path, n=3):
+    return [_write_scan(tmp_path / f"emittance_scan_{T0 + 60 * i}.h5") for i in range(n)]
+
+
+def test_catalog_first_build(tmp_path):
+    files = _files(tmp_path)
+    catalog = update_emittance_catalog(files, tmp_path / "catalog.parquet")
+    assert catalog.height == 3
+    assert catalog["path"].to_list() == [str(f) for f in files]
+    assert catalog["timestamp"].to_list()[0] == dt.datetime.fromtimestamp(T0)
+    assert (catalog["e_rms"] > 0).all()
+    assert read_emittance_catalog(tmp_path / "catalog.parquet").equals(catalog)
+
+
+def test_catalog_reuses_rows_after_mtime_change(tmp_path, monkeypatch):
+    files = _files(tmp_path)
+    catalog_path = tmp_path / "catalog.parquet"
+    before = update_emittance_catalog(files, catalog_path)
+    os.utime(files[0], (0, T0 + 1000))
+
+    import ops.ecris.analysis.emittance_scan.catalog as catalog_module
+
+    def fail(*args):
+        raise AssertionError("unchanged scan was reprocessed")
+
+    monkeypatch.setattr(catalog_module, "_catalog_row", fail)
+    after = update_emittance_catalog(files, catalog_path)
+    assert after["mtime"][0] == T0 + 1000
+    assert after.drop("mtime").equals(before.drop("mtime"))
+
+
+def test_catalog_reprocesses_changed_content(tmp_path):
+    files = _files(tmp_path)
+    catalog_path = tmp_path / "catalog.parquet"
+    before = update_emittance_catalog(files, catalog_path)
+    _write_scan(files[1], width=4.0)
+    os.utime(files[1], (0, T0 + 1000))
+    after = update_emittance_catalog(files, catalog_path)
+    assert after["content_hash"][1] != before["content_hash"][1]
+    assert after["e_rms"][1] > before["e_rms"][1]
+    assert after["e_rms"][0] == before["e_rms"][0]
+
+
+def test_catalog_drops_deleted_files(tmp_path):
+    files = _files(tmp_path)
+    catalog_path = tmp_path / "catalog.parquet"
+    update_emittance_catalog(files, catalog_path)
+    files[2].unlink()
+    catalog = update_emittance_catalog(files[:2], catalog_path)
+    assert catalog["path"].to_list() == [str(f) for f in files[:2]]
+
+
+def test_join_venus_data_tolerance(tmp_path):
+    catalog = update_emittance_catalog(_files(tmp_path, 2), tmp_path / "catalog.parquet")
+    start = dt.datetime.fromtimestamp(T0)
+    venus_data = pd.DataFrame({
+        "time": [start + dt.timedelta(seconds=20), start + dt.timedelta(seconds=70)],
+        "inj_i": [100.0, 200.0],
+    })
+    joined = join_venus_data(catalog, venus_data, tolerance=dt.timedelta(seconds=15))
+    assert np.isnan(joined["inj_i"].iloc[0])
+    assert joined["inj_i"].iloc[1] == 200.0
+    joined = join_venus_data(catalog, venus_data, tolerance=dt.timedelta(seconds=30))
+    assert joined["inj_i"].tolist() == [100.0, 200.0]
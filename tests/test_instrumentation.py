@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from ops.ecris.analysis import instrumentation
+
+
+@pytest.fixture(autouse=True)
+def _reset_instrumentation():
+    instrumentation.reset()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def test_disabled_spans_are_not_recorded():
+    with instrumentation.span("io.read") as s:
+        s.count("rows", 10)
+    instrumentation.count("files")
+    assert instrumentation.summary() == {"spans": {}, "counters": {}}
+
+
+def test_spans_and_counters_are_summarized(tmp_path):
+    instrumentation.enable()
+
+    @instrumentation.instrumented("fit")
+    def fit():
+        with instrumentation.span("fit.direct") as s:
+            s.count("evaluations", 5)
+
+    fit()
+    fit()
+    instrumentation.count("files", 3)
+    path = tmp_path / "summary.json"
+    instrumentation.write_summary(path)
+    summary = json.loads(path.read_text())
+    assert summary["spans"]["fit"]["count"] == 2
+    assert summary["spans"]["fit.direct"]["counters"] == {"evaluations": 10}
+    assert summary["counters"] == {"files": 3}
@@ -0,0 +1,96 @@
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from ops.ecris.analysis.io import read_csd_from_file_pair
+from ops.ecris.analysis.io.read_ahead import prefetch, prefetch_csd_files, result_nbytes
+from ops.ecris.analysis.model import CSD
+
+
+def test_prefetch_keeps_order_and_depth():
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def loader(i):
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.01 * (i % 3))
+        return i * i
+
+    results = []
+    for item, result in prefetch(range(20), loader, depth=3):
+        with lock:
+            in_flight -= 1
+        results.append((item, result))
+    assert results == [(i, i * i) for i in range(20)]
+    # the item being consumed plus `depth` items read ahead
+    assert max_in_flight <= 4
+
+
+def test_prefetch_byte_budget_limits_read_ahead():
+    started = []
+
+    def loader(i):
+        started.append(i)
+        return np.zeros(1000)
+
+    iterator = prefetch(range(10), loader, depth=8, max_bytes=3 * 8000)
+    next(iterator)
+    time.sleep(0.05)
+    assert len(started) == 4
+    iterator.close()
+
+
+def test_prefetch_byte_budget_counts_csd_data(tmp_path):
+    from benchmarks.synthetic import write_synthetic_csd
+
+    files = [write_synthetic_csd(tmp_path / str(i), n_points=10_000) for i in range(6)]
+    csd = CSD(np.zeros((10_000, 8)), "2025-08-01 00:00:00")
+    assert result_nbytes(csd) == csd.data.nbytes
+    csd.m_over_q = np.zeros(10_000)
+    assert result_nbytes(csd) == csd.data.nbytes + 80_000
+
+    started = []
+
+    def loader(file):
+        started.append(file)
+        return read_csd_from_file_pair(file)
+
+    first_size = result_nbytes(read_csd_from_file_pair(files[0]))
+    iterator = prefetch(files, loader, depth=6, max_bytes=2 * first_size)
+    _, first = next(iterator)
+    assert isinstance(first, CSD)
+    time.sleep(0.2)
+    assert len(started) == 3
+    assert len(list(iterator)) == len(files) - 1
+    assert [f for f, _ in prefetch_csd_files(files[:2])] == files[:2]
+
+
+def test_prefetch_raises_loader_errors_in_order():
+    def loader(i):
+        if i == 2:
+            raise OSError("unreadable")
+        return i
+
+    iterator = prefetch(range(5), loader, depth=4)
+    assert [next(iterator)[0] for _ in range(2)] == [0, 1]
+    with pytest.raises(OSError):
+        next(iterator)
+
+
+
+def test_prefetch_function_is_not_shadowed_by_its_module():
+    # a fresh interpreter, so the submodule is first loaded through a sibling name
+    code = (
+        "from ops.ecris.analysis.io import prefetch_csd_files\n"
+        "from ops.ecris.analysis.io import prefetch\n"
+        "assert list(prefetch(range(3), lambda i: 2 * i)) == [(0, 0), (1, 2), (2, 4)]\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
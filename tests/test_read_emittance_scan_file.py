@@ -0,0 +1,68 @@
+import h5py
+import numpy as np
+
+from ops.ecris.analysis.io.read_emittance_scan_file import (
+    load_emittance_scan,
+    load_emittance_scans,
+)
+from ops.ecris.analysis.model.emittance_scan import LazyEmittanceScan
+
+
+def _write_scan(path, axis, position_max):
+    data = np.arange(6 * 5, dtype=float).reshape(6, 5)
+    with h5py.File(path, "w") as f:
+        dataset = f.create_dataset("scan_data", data=data)
+        dataset.attrs.update({
+            "axis": axis,
+            "position_min": -5.0,
+            "position_max": position_max,
+            "position_step": 2.0,
+            "divergence_min": -20.0,
+            "divergence_max": 20.0,
+            "divergence_step": 10.0,
+            "operator": "test",
+        })
+    return data
+
+
+def test_load_emittance_scan_lazy(tmp_path):
+    path = tmp_path / "emittance_scan_1774303663.h5"
+    data = _write_scan(path, "X", 5.0)
+    scan = load_emittance_scan(path, lazy=True)
+    assert isinstance(scan, LazyEmittanceScan)
+    assert not scan.is_loaded
+    assert scan.extra_metadata == {"operator": "test"}
+    assert scan.timestamp != "UNKNOWN"
+    np.testing.assert_array_equal(scan.data, data)
+    assert scan.is_loaded
+
+
+def test_load_emittance_scans_filters_on_header(tmp_path):
+    _write_scan(tmp_path / "emittance_scan_1774303663.h5", "X", 5.0)
+    _write_scan(tmp_path / "emittance_scan_1774303664.h5", "Y", 5.0)
+    _write_scan(tmp_path / "emittance_scan_1774303665.h5", "X", 7.0)
+    files = sorted(tmp_path.glob("*.h5"))
+    assert len(load_emittance_scans(files)) == 3
+    assert len(load_emittance_scans(files, axis="X")) == 2
+    found = load_emittance_scans(files, axis="X", parameter_ranges={"position_max": (6, 8)})
+    assert len(found) == 1
+    assert not found[0].is_loaded
+
+
+
+def test_load_emittance_scans_skips_unreadable_data(tmp_path, monkeypatch):
+    import ops.ecris.analysis.io.read_emittance_scan_file as reader
+
+    _write_scan(tmp_path / "emittance_scan_1774303663.h5", "X", 5.0)
+    _write_scan(tmp_path / "emittance_scan_1774303664.h5", "X", 5.0)
+    read_scan_data = reader.read_scan_data
+
+    def failing_read(filepath, **kwargs):
+        if filepath.name.endswith("64.h5"):
+            raise OSError("corrupt scan data")
+        return read_scan_data(filepath, **kwargs)
+
+    monkeypatch.setattr(reader, "read_scan_data", failing_read)
+    scans = load_emittance_scans(sorted(tmp_path.glob("*.h5")), lazy=False)
+    assert len(scans) == 1
+    assert scans[0].data.shape == (6, 5)
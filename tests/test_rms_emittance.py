@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from ops.ecris.devices.motor_controller_specification import Axis
+from ops.ecris.operations.emittance_scan.parameters import LinearScanParameters
+
+from ops.ecris.analysis.emittance_scan.rms_emittance import (
+    RMSEmittanceAccumulator,
+    calculate_rms_emittance,
+)
+from ops.ecris.analysis.model.emittance_scan import EmittanceScan
+
+
+def _scan() -> EmittanceScan:
+    parameters = LinearScanParameters(
+        axis=list(Axis)[0],
+        position_min=-10.0,
+        position_max=10.0,
+        position_step=1.0,
+        divergence_min=-30.0,
+        divergence_max=30.0,
+        divergence_step=2.0,
+    )
+    x = np.arange(-10.0, 11.0, 1.0)[:, None]
+    xp = np.arange(-30.0, 32.0, 2.0)[None, :]
+    data = np.exp(-(x - 1) ** 2 / 8 - (xp + 3) ** 2 / 90 + 0.02 * x * xp) - 0.01
+    return EmittanceScan("2025-01-01 00:00:00", data, parameters)
+
+
+def test_accumulator_matches_batch_result():
+    scan = _scan()
+    expected = calculate_rms_emittance(scan)
+    accumulator = RMSEmittanceAccumulator(scan.scan_parameters)
+    for i in np.random.default_rng(0).permutation(len(scan.position_range)):
+        accumulator.add_row(int(i), np.zeros(len(scan.divergence_range)))
+        accumulator.add_row(int(i), scan.data[i])
+    result = accumulator.result()
+    for name in ["x_mean", "xp_mean", "alpha", "beta", "gamma", "e_rms"]:
+        assert getattr(result, name) == pytest.approx(getattr(expected, name), rel=1e-9)
+    np.testing.assert_array_equal(result.data, expected.data)
+
+
+def test_accumulator_points_match_rows():
+    scan = _scan()
+    by_row = RMSEmittanceAccumulator(scan.scan_parameters)
+    by_point = RMSEmittanceAccumulator(scan.scan_parameters)
+    for i in range(8, 14):
+        by_row.add_row(i, scan.data[i])
+        for j, value in enumerate(scan.data[i]):
+            by_point.add_point(i, j, value)
+    assert by_point.result().e_rms == pytest.approx(by_row.result().e_rms, rel=1e-9)
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import polars as pl
+
+from ops.ecris.analysis.settings_index import SettingsIndex
+
+KEYS = ["inj_i", "g28_fw"]
+
+
+def _write_day(path, day, inj_i):
+    start = datetime(2025, 8, day).timestamp()
+    time = start + np.arange(0, 86400, 60.0)
+    pl.DataFrame({
+        "time": time,
+        "inj_i": np.where(time < start + 43200, inj_i, inj_i + 10),
+        "g28_fw": np.full_like(time, 5000.0),
+        "filler": np.full_like(time, np.nan),
+    }).write_parquet(path / f"venus_data_2025_08_{day:02d}_00_00_00.parquet")
+
+
+def test_settings_index_queries_and_updates(tmp_path):
+    _write_day(tmp_path, 1, 100.0)
+    index = SettingsIndex.from_venus_path(tmp_path, keys=KEYS, window=timedelta(hours=1))
+    assert len(index) == 24
+
+    closest = index.query({"inj_i": 109.0, "g28_fw": 5000.0}, k=3)
+    assert [m.settings["inj_i"] for m in closest] == [110.0] * 3
+
+    spans = index.query_radius({"inj_i": 100.0, "g28_fw": 5000.0}, radius=0.5)
+    assert len(spans) == 1
+    assert spans[0].start == datetime(2025, 8, 1)
+    assert spans[0].stop == datetime(2025, 8, 1, 12)
+
+    _write_day(tmp_path, 2, 100.0)
+    assert index.update(tmp_path) == 24
+    assert index.update(tmp_path) == 0
+    assert len(index.query_radius({"inj_i": 100.0, "g28_fw": 5000.0}, radius=0.5)) == 2
+
+
+def test_settings_index_keeps_windows_with_filler_keys(tmp_path, caplog):
+    _write_day(tmp_path, 1, 100.0)
+    index = SettingsIndex.from_venus_path(
+        tmp_path, keys=KEYS + ["filler"], window=timedelta(hours=1)
+    )
+    assert len(index) == 24
+    assert "filler" in caplog.text
+    closest = index.query({"inj_i": 109.0, "g28_fw": 5000.0, "filler": 1.0}, k=1)
+    assert closest[0].settings["inj_i"] == 110.0
+
+
+def test_settings_index_saves_and_updates(tmp_path):
+    venus_path = tmp_path / "venus"
+    venus_path.mkdir()
+    index_path = tmp_path / "settings_index.npz"
+    _write_day(venus_path, 1, 100.0)
+    index = SettingsIndex.from_venus_path(
+        venus_path, index_path, keys=KEYS, window=timedelta(hours=1)
+    )
+    _write_day(venus_path, 2, 100.0)
+    loaded = SettingsIndex.load(index_path)
+    assert len(loaded) == len(index) == 24
+    assert loaded.update(venus_path) == 24
+    updated = SettingsIndex.from_venus_path(venus_path, index_path)
+    assert len(updated) == 48
+    assert updated.indexed_files == loaded.indexed_files
+    query = {"inj_i": 100.0, "g28_fw": 5000.0}
+    assert updated.query(query, k=3) == loaded.query(query, k=3)
+
+
+def test_settings_index_skips_unreadable_files(tmp_path):
+    _write_day(tmp_path, 1, 100.0)
+    bad = tmp_path / "venus_data_2025_08_02_00_00_00.parquet"
+    pl.DataFrame({"inj_i": [1.0]}).write_parquet(bad)
+    index = SettingsIndex(keys=KEYS, window=timedelta(hours=1))
+    assert index.update(tmp_path) == 24
+    assert index.indexed_files == {"venus_data_2025_08_01_00_00_00.parquet"}
+
+    _write_day(tmp_path, 2, 100.0)
+    assert index.update(tmp_path) == 24
+    assert len(index) == 48
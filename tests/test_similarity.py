@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from ops.ecris.analysis.csd import SpectrumIndex, resample_csds
+from ops.ecris.analysis.model import CSD
+
+
+def _csd(peaks, scale=1.0, n_points=3000):
+    m_over_q = np.linspace(0.8, 9.5, n_points)
+    data = np.zeros((n_points, 4))
+    data[:, 3] = scale * 1e-6 * sum(np.exp(-((m_over_q - p) ** 2) / 0.001) for p in peaks)
+    csd = CSD(data=data, timestamp="2025-01-01 00:00:00", settings={})
+    csd.m_over_q = m_over_q
+    return csd
+
+
+@pytest.mark.parametrize("reduction", ["pca", "random_projection"])
+def test_spectrum_index_finds_same_shape(reduction):
+    rng = np.random.default_rng(0)
+    peak_sets = [rng.uniform(1.5, 9, 6) for _ in range(50)]
+    index = SpectrumIndex(n_components=16, reduction=reduction)
+    index.fit(resample_csds([_csd(p) for p in peak_sets]), keys=list(range(50)))
+    # same distribution shape at a different intensity and dipole sampling
+    query = _csd(peak_sets[17], scale=3.0, n_points=2500)
+    key, distance = index.query(query, k=3)[0]
+    assert key == 17
+    assert distance < 0.1
@@ -0,0 +1,28 @@
+import subprocess
+import sys
+from pathlib import Path
+
+# generous budget for a cold import on a loaded machine, pandas dominates it
+IMPORT_TIME_BUDGET_S = 3.0
+
+_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import ops.ecris.analysis.venus_data
+print(time.perf_counter() - start)
+print(",".join(m for m in ("polars", "scipy", "sklearn", "matplotlib", "h5py")
+               if m in sys.modules))
+"""
+
+
+def test_venus_data_import_is_light():
+    result = subprocess.run(
+        [sys.executable, "-c", _SCRIPT],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_time, heavy_modules = result.stdout.splitlines()
+    assert heavy_modules == ""
+    assert float(import_time) < IMPORT_TIME_BUDGET_S
@@ -0,0 +1,65 @@
+from datetime import datetime
+
+import numpy as np
+import polars as pl
+
+from ops.ecris.analysis.venus_events import (
+    DerivativeRule,
+    ThresholdRule,
+    ZScoreRule,
+    detect_events,
+)
+
+
+def _write_files(path, n_files=3, rows=1000):
+    time = datetime(2025, 8, 1).timestamp() + np.arange(n_files * rows, dtype=float)
+    extraction_v = np.full(len(time), 20000.0)
+    extraction_v[995:1010] = 5000.0  # trip spanning the first file boundary
+    extraction_v[2500] = 12000.0
+    pressure = 1e-7 + 1e-9 * np.sin(np.arange(len(time)) / 7)
+    pressure[1700] = 5e-7
+    files = []
+    for i in range(n_files):
+        rows_slice = slice(i * rows, (i + 1) * rows)
+        file = path / f"venus_data_2025_08_0{i + 1}_00_00_00.parquet"
+        pl.DataFrame({
+            "time": time[rows_slice],
+            "extraction_v": extraction_v[rows_slice],
+            "inj_mbar": pressure[rows_slice],
+        }).write_parquet(file)
+        files.append(file)
+    return files, time
+
+
+def test_detect_events_across_file_boundaries(tmp_path):
+    files, time = _write_files(tmp_path)
+    rules = [
+        ThresholdRule("hv_trip", "extraction_v", minimum=15000),
+        DerivativeRule("hv_drop", "extraction_v", max_rate=1000, direction="falling"),
+        ZScoreRule("vacuum_spike", "inj_mbar", window=50, threshold=10, direction="rising"),
+        ThresholdRule("missing_column", "LHe_level_percent", minimum=50),
+    ]
+    events = detect_events(files, rules, max_gap=5)
+
+    trips = events.filter(pl.col("rule") == "hv_trip")
+    assert trips["n_samples"].to_list() == [15, 1]
+    assert trips["start"][0] == datetime.fromtimestamp(time[995])
+    assert trips["stop"][0] == datetime.fromtimestamp(time[1009])
+    assert trips["min_value"][0] == 5000.0
+
+    assert events.filter(pl.col("rule") == "hv_drop")["n_samples"].to_list() == [1, 1]
+    spikes = events.filter(pl.col("rule") == "vacuum_spike")
+    assert spikes["start"].to_list() == [datetime.fromtimestamp(time[1700])]
+    assert events.filter(pl.col("rule") == "missing_column").is_empty()
+
+
+def test_flat_channels_and_repeated_times_are_not_flagged(tmp_path):
+    time = datetime(2025, 8, 1).timestamp() + np.arange(200, dtype=float)
+    time[100] = time[99]
+    file = tmp_path / "venus_data_2025_08_01_00_00_00.parquet"
+    pl.DataFrame({"time": time, "x": np.full(len(time), 5.0)}).write_parquet(file)
+    rules = [
+        ZScoreRule("flat", "x", window=10, threshold=5),
+        DerivativeRule("step", "x", max_rate=1),
+    ]
+    assert detect_events([file], rules).is_empty()